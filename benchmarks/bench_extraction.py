@@ -0,0 +1,64 @@
+"""Porównanie wyciągania pól z opisów ofert: re.search per oferta vs prekompilowane wzorce vs Series.str.extract
+
+Użycie:
+    python benchmarks/bench_extraction.py
+    python benchmarks/bench_extraction.py -n 20000
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extraction import extract_fields, extract_fields_batch  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def extract_inline(description_text):
+    """Dotychczasowa ekstrakcja z get_job_description - wzorce podawane jako napisy przy każdym wywołaniu"""
+    job_details = {}
+    salary_match = re.search(r'Kwota od (\d+)\s*(?:tysięcy|tys\.?)\s*do\s*(\d+)\s*(?:tysięcy|tys\.?)', description_text)
+    if salary_match:
+        job_details['salary_range'] = {
+            'min': int(salary_match.group(1)) * 1000,
+            'max': int(salary_match.group(2)) * 1000,
+            'currency': 'PLN'
+        }
+    hours_match = re.search(r'(?:Około|Ok\.|około)\s*(\d+)\s*h(?:odzin)?\s*(?:w|na)\s*miesiąc', description_text)
+    if hours_match:
+        job_details['monthly_hours'] = int(hours_match.group(1))
+    schedule_match = re.search(r'(?:Zjazdy|System|Praca)\s*(\d+/\d+)(?:\s*(?:tygodnie|dni))?', description_text)
+    if schedule_match:
+        job_details['work_schedule'] = schedule_match.group(1)
+    return job_details
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wyciągania pól z opisów ofert')
+    parser.add_argument('-n', '--count', type=int, default=100_000, help='Liczba opisów (domyślnie: 100000)')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    descriptions = [fixtures.description(rng, n) for n in range(args.count)]
+    print(f"Korpus: {len(descriptions)} opisów, {sum(map(len, descriptions)) / 2**20:.1f} MiB tekstu")
+
+    variants = [
+        ('re.search per oferta (dotychczas)', lambda: [extract_inline(d) for d in descriptions]),
+        ('prekompilowane wzorce per oferta', lambda: [extract_fields(d) for d in descriptions]),
+        ('Series.str.extract (paczka)', lambda: extract_fields_batch(descriptions)),
+    ]
+    baseline = None
+    for name, run in variants:
+        start = time.perf_counter()
+        result = run()
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{name:<36} {elapsed:>7.2f} s  {len(result) / elapsed:>10,.0f} opisów/s   x{baseline / elapsed:.1f}")
+
+
+if __name__ == '__main__':
+    main()
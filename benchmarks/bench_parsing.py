@@ -0,0 +1,99 @@
+"""Porównanie czasu i pamięci parsowania stron: html.parser na całym drzewie vs lxml + SoupStrainer
+
+Użycie:
+    python benchmarks/bench_parsing.py
+    python benchmarks/bench_parsing.py --listing lista.html --detail oferta.html
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parsers import DEFAULT_PARSER, LISTING_STRAINER, DETAIL_STRAINER, make_soup  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def read_listing(soup):
+    """Odczytuje elementy strony z listą ofert tak jak scraper"""
+    return len(soup.find_all('div', class_='list__item'))
+
+
+def read_detail(soup):
+    """Odczytuje elementy strony oferty tak jak scraper"""
+    found = [
+        soup.find('div', class_='ogl__description'),
+        soup.find('div', class_='oglDetails'),
+        soup.find('span', class_='topBar__item--address'),
+        soup.find('div', class_='oglStats'),
+    ]
+    return sum(1 for element in found if element is not None)
+
+
+def variants():
+    """Porównywane warianty parsowania: (nazwa, funkcja(content, strainer))"""
+    result = [
+        ('html.parser, cała strona (str)', lambda content, strainer: BeautifulSoup(content.decode('utf-8'), 'html.parser')),
+        ('html.parser + SoupStrainer (bytes)', lambda content, strainer: make_soup(content, strainer, 'html.parser')),
+    ]
+    if DEFAULT_PARSER == 'lxml':
+        result += [
+            ('lxml, cała strona (bytes)', lambda content, strainer: make_soup(content, None, 'lxml')),
+            ('lxml + SoupStrainer (bytes)', lambda content, strainer: make_soup(content, strainer, 'lxml')),
+        ]
+    return result
+
+
+def measure(parse, read, content, strainer, repeat):
+    """Zwraca medianę czasu parsowania [ms] i szczytowe zużycie pamięci [KiB] dla jednej strony"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read(parse(content, strainer))
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    soup = parse(content, strainer)
+    read(soup)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark parsowania stron z ofertami')
+    parser.add_argument('--listing', type=str, help='Zapisany plik HTML strony z listą ofert')
+    parser.add_argument('--detail', type=str, help='Zapisany plik HTML strony oferty')
+    parser.add_argument('-r', '--repeat', type=int, default=50, help='Liczba powtórzeń (domyślnie: 50)')
+    args = parser.parse_args()
+
+    pages = []
+    if args.listing:
+        with open(args.listing, 'rb') as f:
+            pages.append(('lista ofert', f.read(), LISTING_STRAINER, read_listing))
+    else:
+        pages.append(('lista ofert', fixtures.listing_page().encode('utf-8'), LISTING_STRAINER, read_listing))
+    if args.detail:
+        with open(args.detail, 'rb') as f:
+            pages.append(('oferta', f.read(), DETAIL_STRAINER, read_detail))
+    else:
+        pages.append(('oferta', fixtures.detail_page(1).encode('utf-8'), DETAIL_STRAINER, read_detail))
+
+    for page_name, content, strainer, read in pages:
+        print(f"\nStrona: {page_name} ({len(content) / 1024:.1f} KiB)")
+        print(f"{'wariant':<40} {'czas [ms]':>10} {'pamięć [KiB]':>14}")
+        baseline = None
+        for name, parse in variants():
+            elapsed, peak = measure(parse, read, content, strainer, args.repeat)
+            baseline = baseline or elapsed
+            print(f"{name:<40} {elapsed:>10.2f} {peak:>14.0f}   x{baseline / elapsed:.1f}")
+
+
+if __name__ == '__main__':
+    main()
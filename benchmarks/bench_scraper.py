@@ -0,0 +1,243 @@
+"""Benchmark całego przebiegu: scrape_jobs na lokalnym serwerze i DatabaseManager.save_jobs
+
+Scraper pobiera strony z benchmarks/fake_server.py (bez dostępu do sieci), a oferty
+zapisujemy do mongomock albo do lokalnego mongod (--mongo-uri). Wynik każdego
+uruchomienia dopisujemy z hashem commita do benchmarks/results.jsonl (lokalna historia
+wyników zależna od maszyny - plik jest w .gitignore) i porównujemy z poprzednim
+uruchomieniem o tej samej konfiguracji. Przy --sources N scrapujemy równocześnie
+N źródeł - każde z osobnym serwerem i własnym limitem zapytań.
+
+Użycie:
+    python benchmarks/bench_scraper.py
+    python benchmarks/bench_scraper.py --pages 10 --latency 50 --error-rate 0.05 -c 8
+    python benchmarks/bench_scraper.py --mongo-uri mongodb://localhost:27017/ -w 2
+    python benchmarks/bench_scraper.py --sources 3 --rate 20
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.join(BENCH_DIR, '..')
+sys.path.insert(0, REPO_DIR)
+sys.path.insert(0, BENCH_DIR)
+
+from db_manager import DatabaseManager  # noqa: E402
+from instrumentation import metrics  # noqa: E402
+from job_scraper import JobScraper, MultiSourceScraper  # noqa: E402
+from rate_limiter import AdaptiveRateLimiter  # noqa: E402
+from sources import TrojmiastoSource  # noqa: E402
+from fake_server import StandInServer  # noqa: E402
+
+# mongomock jest potrzebny tylko wtedy, gdy nie podano adresu prawdziwej bazy
+try:
+    import mongomock
+except ImportError:
+    mongomock = None
+
+BENCH_DB = 'job_scraper_bench'
+# Etapy, których czasy zapisujemy w wynikach (pełne statystyki trafiają do pola stages)
+KEY_STAGES = ['get_page.network', 'get_job_description.network', 'get_job_description.parse',
+              'save_jobs', 'save_jobs.bulk_write']
+
+
+def git_commit():
+    """Zwraca skrócony hash bieżącego commita (z sufiksem -dirty, jeśli są niezapisane zmiany)"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + '-dirty' if dirty else commit
+
+
+def make_database(args):
+    """Tworzy DatabaseManager na pustej bazie benchmarku"""
+    if args.mongo_uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.mongo_uri)
+    elif mongomock is not None:
+        client = mongomock.MongoClient()
+    else:
+        raise RuntimeError("Benchmark wymaga pakietu mongomock albo adresu bazy (--mongo-uri)")
+    client.drop_database(BENCH_DB)
+    return DatabaseManager(client=client, db_name=BENCH_DB)
+
+
+def run(args):
+    """Wykonuje jedno uruchomienie benchmarku i zwraca jego wyniki"""
+    metrics.reset()
+    servers = [
+        StandInServer(pages=args.pages, per_page=args.per_page, latency=args.latency / 1000,
+                      jitter=args.jitter / 1000, error_rate=args.error_rate, seed=args.seed,
+                      listing_file=args.listing, detail_file=args.detail)
+        for _ in range(args.sources)
+    ]
+    with contextlib.ExitStack() as stack:
+        for server in servers:
+            stack.enter_context(server)
+        # Limit zapytań ustawiamy na stałe - benchmark mierzy scraper, a nie dostrajanie tempa
+        limiter = AdaptiveRateLimiter(rate=args.rate, max_rate=args.rate)
+        if args.sources == 1:
+            scraper = JobScraper(concurrency=args.concurrency, parser=args.parser, rate_limiter=limiter,
+                                 max_retries=args.max_retries, parse_workers=args.parse_workers,
+                                 parse_batch=args.parse_batch, base_url=servers[0].url)
+        else:
+            # Każde źródło ma osobny serwer (host), więc wspólny limiter i tak liczy limit osobno dla źródła
+            sources = [TrojmiastoSource(server.url, name=f'local{i + 1}') for i, server in enumerate(servers)]
+            scraper = MultiSourceScraper(sources, concurrency=args.concurrency, parser=args.parser,
+                                         rate_limiter=limiter, max_retries=args.max_retries,
+                                         parse_workers=args.parse_workers, parse_batch=args.parse_batch)
+        start = time.perf_counter()
+        jobs = scraper.scrape_jobs(num_pages=args.pages, max_jobs=args.max_jobs)
+        scrape_time = time.perf_counter() - start
+        server_stats = {key: sum(server.stats[key] for server in servers) for key in servers[0].stats}
+
+    db = make_database(args)
+    start = time.perf_counter()
+    db.save_jobs(jobs, batch_size=args.batch_size)
+    insert_time = time.perf_counter() - start
+    # Drugi zapis tych samych ofert - hashe treści się zgadzają, więc save_jobs niczego nie aktualizuje
+    start = time.perf_counter()
+    unchanged_counts = db.save_jobs(jobs, batch_size=args.batch_size)
+    unchanged_time = time.perf_counter() - start
+    # Trzeci zapis ofert ze zmienionym wynagrodzeniem - ścieżka aktualizacji istniejących dokumentów
+    # (nowy hash treści, statystyki i wpis w historii oferty)
+    changed = [{**job, 'salary': f"{job.get('salary') or 'brak'} (zmiana)"} for job in jobs]
+    start = time.perf_counter()
+    update_counts = db.save_jobs(changed, batch_size=args.batch_size)
+    update_time = time.perf_counter() - start
+    if unchanged_counts['unchanged'] != len(jobs) or update_counts['updated'] != len(jobs):
+        raise RuntimeError(f"Nieoczekiwany wynik zapisu: bez zmian {unchanged_counts}, po zmianie {update_counts}")
+
+    summary = metrics.summary()
+    return {
+        'offers': len(jobs),
+        'scrape_s': round(scrape_time, 3),
+        'scrape_offers_per_s': round(len(jobs) / scrape_time, 2) if scrape_time else None,
+        'db_insert_s': round(insert_time, 3),
+        'db_insert_offers_per_s': round(len(jobs) / insert_time, 2) if insert_time else None,
+        'db_unchanged_s': round(unchanged_time, 3),
+        'db_unchanged_offers_per_s': round(len(jobs) / unchanged_time, 2) if unchanged_time else None,
+        'db_update_s': round(update_time, 3),
+        'db_update_offers_per_s': round(len(jobs) / update_time, 2) if update_time else None,
+        'server': server_stats,
+        'key_stages': {name: summary['stages'][name] for name in KEY_STAGES if name in summary['stages']},
+        'stages': summary['stages'],
+        'counters': summary['counters'],
+    }
+
+
+def config(args):
+    """Parametry uruchomienia, które muszą się zgadzać, żeby wyniki były porównywalne"""
+    return {
+        'pages': args.pages, 'per_page': args.per_page, 'max_jobs': args.max_jobs,
+        'latency_ms': args.latency, 'jitter_ms': args.jitter, 'error_rate': args.error_rate,
+        'concurrency': args.concurrency, 'parse_workers': args.parse_workers, 'parse_batch': args.parse_batch,
+        'rate': args.rate, 'parser': args.parser, 'batch_size': args.batch_size,
+        'database': 'mongod' if args.mongo_uri else 'mongomock',
+        'recorded': bool(args.listing or args.detail), 'seed': args.seed,
+        **({'sources': args.sources} if args.sources > 1 else {}),
+    }
+
+
+def previous_result(filename, run_config):
+    """Zwraca ostatni zapisany wynik o tej samej konfiguracji lub None"""
+    if not os.path.exists(filename):
+        return None
+    previous = None
+    with open(filename, encoding='utf-8') as f:
+        for line in f:
+            record = json.loads(line)
+            if record.get('config') == run_config:
+                previous = record
+    return previous
+
+
+def print_result(result, previous):
+    """Wypisuje wyniki uruchomienia i zmianę względem poprzedniego"""
+    print("\nWyniki benchmarku:")
+    print("-" * 50)
+    rows = [
+        ('scrapowanie [ofert/s]', 'scrape_offers_per_s'),
+        ('zapis nowych [ofert/s]', 'db_insert_offers_per_s'),
+        ('zapis niezmienionych [ofert/s]', 'db_unchanged_offers_per_s'),
+        ('zapis zmienionych [ofert/s]', 'db_update_offers_per_s'),
+    ]
+    for label, key in rows:
+        line = f"{label:<34} {result[key]:>10}"
+        if previous and previous['result'].get(key):
+            change = (result[key] / previous['result'][key] - 1) * 100
+            line += f"   ({change:+.1f}% względem {previous['commit']})"
+        print(line)
+    print(f"\n{'etap':<34} {'p50 [ms]':>9} {'p95 [ms]':>9} {'p99 [ms]':>9}")
+    for name, stats in result['key_stages'].items():
+        line = f"{name:<34} {stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}"
+        previous_stats = previous and previous['result']['key_stages'].get(name)
+        if previous_stats and previous_stats['p50_ms']:
+            line += f"   (p50 {(stats['p50_ms'] / previous_stats['p50_ms'] - 1) * 100:+.1f}%)"
+        print(line)
+    print(f"\nSerwer: {result['server']['requests']} zapytań, {result['server']['errors']} błędów 503")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark scrapera i zapisu do bazy na lokalnym serwerze')
+    parser.add_argument('-p', '--pages', type=int, default=5, help='Liczba stron z ofertami (domyślnie: 5)')
+    parser.add_argument('--per-page', type=int, default=30, help='Liczba ofert na stronie (domyślnie: 30)')
+    parser.add_argument('-m', '--max-jobs', type=int, default=None,
+                        help='Maksymalna liczba ofert (domyślnie: wszystkie oferty ze stron)')
+    parser.add_argument('--latency', type=float, default=20, help='Opóźnienie odpowiedzi serwera w ms (domyślnie: 20)')
+    parser.add_argument('--jitter', type=float, default=0, help='Losowy rozrzut opóźnienia w ms (domyślnie: 0)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Odsetek odpowiedzi 503 (domyślnie: 0)')
+    parser.add_argument('--seed', type=int, default=0, help='Ziarno generatora stron i błędów (domyślnie: 0)')
+    parser.add_argument('--listing', type=str, help='Nagrany plik HTML strony z listą ofert')
+    parser.add_argument('--detail', type=str, help='Nagrany plik HTML strony oferty')
+    parser.add_argument('-c', '--concurrency', type=int, default=4,
+                        help='Liczba równoległych pobrań (dla każdego źródła) (domyślnie: 4)')
+    parser.add_argument('-s', '--sources', type=int, default=1,
+                        help='Liczba źródeł scrapowanych równocześnie, każde z osobnym serwerem (domyślnie: 1)')
+    parser.add_argument('-w', '--parse-workers', type=int, default=0,
+                        help='Liczba procesów parsujących (domyślnie: 0 - parsowanie w wątkach)')
+    parser.add_argument('--parse-batch', type=int, default=16, help='Rozmiar paczki do procesu parsującego (domyślnie: 16)')
+    parser.add_argument('-r', '--rate', type=float, default=1000,
+                        help='Stały limit zapytań na sekundę (domyślnie: 1000 - praktycznie bez limitu)')
+    parser.add_argument('--max-retries', type=int, default=3, help='Liczba ponowień zapytania (domyślnie: 3)')
+    parser.add_argument('--parser', type=str, default=None, choices=['lxml', 'html.parser', 'html5lib'],
+                        help='Parser HTML (domyślnie: lxml, jeśli jest zainstalowany)')
+    parser.add_argument('--batch-size', type=int, default=50, help='Rozmiar paczki zapisu do bazy (domyślnie: 50)')
+    parser.add_argument('--mongo-uri', type=str, default=None,
+                        help='Adres lokalnego mongod (domyślnie: mongomock w pamięci)')
+    parser.add_argument('--results', type=str, default=os.path.join(BENCH_DIR, 'results.jsonl'),
+                        help='Plik, do którego dopisujemy wyniki (domyślnie: benchmarks/results.jsonl)')
+    parser.add_argument('--no-record', action='store_true', help='Nie zapisuj wyniku do pliku')
+    args = parser.parse_args()
+    if args.max_jobs is None:
+        args.max_jobs = args.pages * args.per_page
+
+    run_config = config(args)
+    result = run(args)
+    previous = previous_result(args.results, run_config)
+    print_result(result, previous)
+
+    if not args.no_record:
+        record = {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'config': run_config,
+            'result': result,
+        }
+        with open(args.results, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"\nZapisano wynik do pliku {args.results}")
+
+
+if __name__ == '__main__':
+    main()
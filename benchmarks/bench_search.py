@@ -0,0 +1,137 @@
+"""Benchmark wyszukiwania (DatabaseManager.search) na dużej kolekcji ofert w MongoDB
+
+Wymaga lokalnego mongod - mongomock nie obsługuje $text ani explain. Kolekcję wypełniamy
+syntetycznymi ofertami (insert_many, bez scrapera i save_jobs), a dla każdego zapytania
+sprawdzamy plan (explain_search). Benchmark kończy się błędem, jeśli któreś zapytanie
+skanuje całą kolekcję (COLLSCAN), sortuje wyniki w pamięci (SORT) albo przegląda wielokrotnie
+więcej dokumentów, niż zwraca. Bazę benchmarku zostawiamy - --reuse pomija wypełnianie.
+
+Użycie:
+    python benchmarks/bench_search.py --mongo-uri mongodb://localhost:27017/
+    python benchmarks/bench_search.py --mongo-uri mongodb://localhost:27017/ -n 100000 --reuse
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from itertools import islice
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from pymongo import MongoClient  # noqa: E402
+from db_manager import DatabaseManager  # noqa: E402
+from bench_store import generate_jobs  # noqa: E402
+
+BENCH_DB = 'job_scraper_search_bench'
+TITLES = ['Programista Python', 'Kierowca kat. C', 'Magazynier', 'Księgowa', 'Sprzedawca', 'Kucharz',
+          'Murarz', 'Analityk danych', 'Handlowiec', 'Recepcjonistka', 'Elektryk', 'Spawacz',
+          'Kelner', 'Kasjer', 'Operator wózka widłowego', 'Specjalista ds. kadr', 'Tester oprogramowania',
+          'Kierownik budowy', 'Doradca klienta', 'Fizjoterapeuta']
+
+# Zapytania benchmarku: same filtry, filtry z wynagrodzeniem i wyszukiwanie pełnotekstowe
+QUERIES = [
+    ('bez filtrów', {}),
+    ('branża', {'filters': {'industry': 'IT'}}),
+    ('lokalizacja', {'filters': {'location': 'Sopot'}}),
+    ('umowa + tryb pracy', {'filters': {'contract_type': 'kontrakt B2B', 'work_mode': 'zdalna'}}),
+    ('branża + 2 lokalizacje + wynagr.', {'filters': {'industry': 'Finanse', 'location': ['Gdańsk', 'Gdynia']},
+                                          'salary_min': 8000}),
+    ('wąski zakres wynagrodzenia', {'salary_min': 12000, 'salary_max': 12000}),
+    ('szeroki zakres wynagrodzenia', {'salary_min': 5000}),
+    ('tekst: rzadkie słowo', {'text': '123457'}),
+    ('tekst: tytuł', {'text': 'spawacz'}),
+    ('tekst + branża', {'text': 'magazynier', 'filters': {'industry': 'Logistyka'}}),
+]
+
+
+def seed(db, n, chunk_size=10000):
+    """Wypełnia kolekcję n syntetycznymi ofertami z opisami"""
+    rng = random.Random(1)
+    jobs = generate_jobs(n, days=60, descriptions=True)
+    inserted = 0
+    start = time.perf_counter()
+    while True:
+        chunk = list(islice(jobs, chunk_size))
+        if not chunk:
+            break
+        for job in chunk:
+            job['title'] = f"{rng.choice(TITLES)} {job['offer_id']}"
+        db.jobs.insert_many(chunk, ordered=False)
+        inserted += len(chunk)
+        print(f"Zapisano {inserted}/{n} ofert ({inserted / (time.perf_counter() - start):.0f} ofert/s)", end='\r')
+    print()
+
+
+def timed_ms(func, repeat):
+    """Wykonuje funkcję repeat razy i zwraca czasy w milisekundach"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.array(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark wyszukiwania ofert w MongoDB')
+    parser.add_argument('--mongo-uri', type=str, required=True, help='Adres lokalnego mongod')
+    parser.add_argument('-n', '--jobs', type=int, default=1000000, help='Liczba ofert w kolekcji (domyślnie: 1000000)')
+    parser.add_argument('--reuse', action='store_true', help='Użyj kolekcji z poprzedniego uruchomienia, jeśli ma n ofert')
+    parser.add_argument('--repeat', type=int, default=20, help='Liczba powtórzeń zapytania (domyślnie: 20)')
+    parser.add_argument('--pages', type=int, default=50, help='Liczba stron wyników przy paginacji (domyślnie: 50)')
+    parser.add_argument('--limit', type=int, default=20, help='Liczba ofert na stronie (domyślnie: 20)')
+    args = parser.parse_args()
+
+    client = MongoClient(args.mongo_uri)
+    if not (args.reuse and client[BENCH_DB]['jobs'].estimated_document_count() == args.jobs):
+        client.drop_database(BENCH_DB)
+        # Indeksy zakłada DatabaseManager - pusta kolekcja, więc nie przeliczamy statystyk
+        db = DatabaseManager(client=client, db_name=BENCH_DB)
+        seed(db, args.jobs)
+    else:
+        db = DatabaseManager(client=client, db_name=BENCH_DB)
+
+    print(f"\n{'zapytanie':<34} {'p50 [ms]':>9} {'p95 [ms]':>9} {'wyniki':>7} {'klucze':>9} {'dokumenty':>10}  plan")
+    problems = []
+    for name, params in QUERIES:
+        plan = db.explain_search(limit=args.limit, **params)
+        times = timed_ms(lambda: db.search(limit=args.limit, **params), args.repeat)
+        problems += [f"{name}: {problem}" for problem in plan['problems']]
+        print(f"{name:<34} {np.percentile(times, 50):>9.1f} {np.percentile(times, 95):>9.1f} "
+              f"{plan['returned']:>7} {plan['keys_examined']:>9} {plan['docs_examined']:>10}  "
+              f"{' <- '.join(plan['stages'])} [{', '.join(plan['indexes'])}]")
+
+    # Paginacja kursorem - czas kolejnych stron nie powinien rosnąć z numerem strony (wyszukiwanie
+    # pełnotekstowe kończy się po TEXT_MAX_RESULTS ofertach)
+    print(f"\nPaginacja ({args.pages} stron po {args.limit} ofert):")
+    for name, params in [QUERIES[1], QUERIES[2], QUERIES[8]]:
+        cursor, last_cursor, times = None, None, []
+        for _ in range(args.pages):
+            last_cursor = cursor
+            start = time.perf_counter()
+            page = db.search(limit=args.limit, cursor=cursor, **params)
+            times.append((time.perf_counter() - start) * 1000)
+            cursor = page['next_cursor']
+            if not cursor:
+                break
+        plan = db.explain_search(limit=args.limit, cursor=last_cursor, **params)
+        problems += [f"{name} (ostatnia strona): {problem}" for problem in plan['problems']]
+        print(f"- {name}: {len(times)} stron, pierwsza {times[0]:.1f} ms, ostatnia {times[-1]:.1f} ms, "
+              f"p50 {np.percentile(times, 50):.1f} ms, dokumenty ostatniej strony: {plan['docs_examined']}")
+
+    if problems:
+        print("\nProblemy planów zapytań:")
+        for problem in problems:
+            print(f"- {problem}")
+        return 1
+    print("\nŻadne zapytanie nie skanuje kolekcji, nie sortuje wyników w pamięci "
+          "ani nie przegląda nadmiarowych dokumentów")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+"""Benchmark magazynu Parquet: zapis, liczba ofert, podsumowanie i eksport dla dużej liczby ofert
+
+Oferty generujemy bezpośrednio jako słowniki (bez HTML i sieci). Opisy są domyślnie
+pomijane - benchmark dotyczy analityki na kolumnach, a nie wykrywania duplikatów.
+
+Użycie:
+    python benchmarks/bench_store.py
+    python benchmarks/bench_store.py -n 1000000 --batch-size 100000
+"""
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from parquet_store import ParquetStore  # noqa: E402
+import fixtures  # noqa: E402
+
+
+def generate_jobs(n, days, seed=0, descriptions=False):
+    """Generuje n ofert rozłożonych na podaną liczbę dni scrapowania"""
+    rng = random.Random(seed)
+    start = datetime(2026, 1, 1)
+    for i in range(n):
+        scraped = start + timedelta(days=i * days // n)
+        low = rng.randint(3, 12)
+        yield {
+            'title': f'Stanowisko {i}',
+            'url': f'https://ogloszenia.trojmiasto.pl/praca-zatrudnie/stanowisko-{i}-ogl{6500000 + i}.html',
+            'offer_id': str(6500000 + i),
+            'location': rng.choice(fixtures.CITIES),
+            'salary': f'{low} 000 zł',
+            'date_posted': scraped.strftime('%d.%m.%Y'),
+            'contract_type': rng.choice(fixtures.CONTRACT_TYPES),
+            'work_mode': rng.choice(fixtures.WORK_MODES),
+            'industry': rng.choice(fixtures.INDUSTRIES),
+            'position_level': rng.choice(fixtures.LEVELS),
+            'work_time': rng.choice(['pełny etat', 'część etatu']),
+            'description': fixtures.description(rng, i) if descriptions else None,
+            'salary_range': {'min': low * 1000, 'max': (low + rng.randint(1, 6)) * 1000, 'currency': 'PLN'},
+            'monthly_hours': rng.choice([80, 120, 160, None]),
+            'scraped_date': scraped.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+
+def timed(label, func):
+    """Wykonuje funkcję i wypisuje czas jej wykonania"""
+    start = time.perf_counter()
+    result = func()
+    print(f"{label:<34} {time.perf_counter() - start:>9.2f} s")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark magazynu ofert Parquet')
+    parser.add_argument('-n', '--jobs', type=int, default=200000, help='Liczba ofert (domyślnie: 200000)')
+    parser.add_argument('--days', type=int, default=30, help='Liczba dni scrapowania (partycji) (domyślnie: 30)')
+    parser.add_argument('--batch-size', type=int, default=50000, help='Rozmiar paczki zapisu (domyślnie: 50000)')
+    parser.add_argument('--descriptions', action='store_true', help='Generuj opisy ofert (wolniej - MinHash)')
+    parser.add_argument('--path', type=str, default=None, help='Katalog magazynu (domyślnie: katalog tymczasowy)')
+    args = parser.parse_args()
+
+    path = args.path or tempfile.mkdtemp(prefix='jobs_dataset_')
+    try:
+        store = ParquetStore(path)
+        jobs = generate_jobs(args.jobs, args.days, descriptions=args.descriptions)
+        timed('zapis ofert', lambda: store.save_jobs(jobs, batch_size=args.batch_size))
+        store.compact()
+        size = sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+        print(f"Rozmiar magazynu: {size / 1024 ** 2:.1f} MiB ({size / args.jobs:.0f} B na ofertę)")
+
+        store = ParquetStore(path)
+        count = timed('liczba ofert', store.get_jobs_count)
+        summary = timed('podsumowanie', store.get_jobs_summary)
+        timed('eksport CSV (wszystkie kolumny)', lambda: store.export_to_csv(os.path.join(path, 'export.csv')))
+        print(f"Ofert: {count}, unikalnych: {summary['unique_jobs']}, branż: {len(summary['industries'])}")
+    finally:
+        if not args.path:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,169 @@
+"""Lokalny serwer udający ogloszenia.trojmiasto.pl - serwuje syntetyczne lub nagrane strony ofert
+
+Użycie samodzielne (np. do ręcznego uruchomienia main.py przeciwko serwerowi):
+    python benchmarks/fake_server.py --port 8000 --pages 10 --latency 50 --error-rate 0.05
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures  # noqa: E402
+
+LISTING_PATH = '/praca-zatrudnie/'
+DETAIL_PATTERN = re.compile(r'ogl(\d+)\.html$')
+# Syntetyczne oferty mają ID 6500000 + numer oferty (patrz fixtures.listing_page)
+FIRST_OFFER_ID = 6500000
+
+
+class StandInServer:
+    """Serwer HTTP w osobnym wątku z konfigurowalnym opóźnieniem, odsetkiem błędów i liczbą stron"""
+
+    def __init__(self, pages=5, per_page=30, latency=0.0, jitter=0.0, error_rate=0.0,
+                 seed=0, port=0, listing_file=None, detail_file=None):
+        # latency, jitter - opóźnienie odpowiedzi i jego losowy rozrzut w sekundach
+        # error_rate - odsetek odpowiedzi 503 (scraper powinien je ponowić)
+        # listing_file, detail_file - nagrane strony serwowane zamiast syntetycznych
+        self.pages = pages
+        self.per_page = per_page
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.stats = {'requests': 0, 'errors': 0, 'bytes': 0}
+        self.recorded = {}
+        for kind, filename in (('listing', listing_file), ('detail', detail_file)):
+            if filename:
+                with open(filename, 'rb') as f:
+                    self.recorded[kind] = f.read()
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def url(self):
+        """Adres listy ofert - do przekazania jako JobScraper(base_url=...)"""
+        return f'http://127.0.0.1:{self.httpd.server_address[1]}{LISTING_PATH}'
+
+    def start(self):
+        """Uruchamia serwer w wątku w tle"""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """Zatrzymuje serwer"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    @lru_cache(maxsize=None)
+    def listing(self, page):
+        """Strona z listą ofert - poza zakresem stron zwracamy pustą listę"""
+        if 'listing' in self.recorded:
+            return self.recorded['listing']
+        per_page = self.per_page if page <= self.pages else 0
+        # Adresy ofert są względne, tak jak na prawdziwej stronie
+        return fixtures.listing_page(page, per_page=per_page, base_url='', seed=self.seed).encode('utf-8')
+
+    @lru_cache(maxsize=None)
+    def detail(self, n):
+        """Strona oferty numer n"""
+        if 'detail' in self.recorded:
+            return self.recorded['detail']
+        return fixtures.detail_page(n, seed=self.seed).encode('utf-8')
+
+    def _delay_and_fail(self):
+        """Losuje opóźnienie odpowiedzi i to, czy serwer ma zwrócić błąd"""
+        with self.lock:
+            delay = self.latency + self.random.uniform(0, self.jitter) if self.jitter else self.latency
+            failed = self.random.random() < self.error_rate
+            self.stats['requests'] += 1
+            if failed:
+                self.stats['errors'] += 1
+        return delay, failed
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Nagłówki i treść idą osobnymi zapisami - bez tego algorytm Nagle'a dokłada ~40 ms
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                delay, failed = server._delay_and_fail()
+                if delay:
+                    time.sleep(delay)
+                if failed:
+                    self.send_response(503)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                parts = urlsplit(self.path)
+                detail_match = DETAIL_PATTERN.search(parts.path)
+                if detail_match:
+                    body = server.detail(int(detail_match.group(1)) - FIRST_OFFER_ID)
+                elif parts.path == LISTING_PATH:
+                    page = int(parse_qs(parts.query).get('strona', ['1'])[0])
+                    body = server.listing(page)
+                else:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+
+                with server.lock:
+                    server.stats['bytes'] += len(body)
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Lokalny serwer z syntetycznymi ofertami pracy')
+    parser.add_argument('--port', type=int, default=8000, help='Port serwera (domyślnie: 8000)')
+    parser.add_argument('--pages', type=int, default=5, help='Liczba stron z ofertami (domyślnie: 5)')
+    parser.add_argument('--per-page', type=int, default=30, help='Liczba ofert na stronie (domyślnie: 30)')
+    parser.add_argument('--latency', type=float, default=0, help='Opóźnienie odpowiedzi w ms (domyślnie: 0)')
+    parser.add_argument('--jitter', type=float, default=0, help='Losowy rozrzut opóźnienia w ms (domyślnie: 0)')
+    parser.add_argument('--error-rate', type=float, default=0, help='Odsetek odpowiedzi 503 (domyślnie: 0)')
+    parser.add_argument('--listing', type=str, help='Nagrany plik HTML strony z listą ofert')
+    parser.add_argument('--detail', type=str, help='Nagrany plik HTML strony oferty')
+    args = parser.parse_args()
+
+    server = StandInServer(pages=args.pages, per_page=args.per_page, latency=args.latency / 1000,
+                           jitter=args.jitter / 1000, error_rate=args.error_rate, port=args.port,
+                           listing_file=args.listing, detail_file=args.detail)
+    print(f"Serwer działa pod adresem {server.url} (Ctrl+C kończy)")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+import random
+
+# Syntetyczne strony o strukturze i rozmiarze zbliżonym do ogloszenia.trojmiasto.pl
+
+CITIES = ['Gdańsk', 'Gdynia', 'Sopot', 'Rumia', 'Pruszcz Gdański', 'Reda', 'Wejherowo']
+INDUSTRIES = ['IT', 'Handel', 'Logistyka', 'Budownictwo', 'Gastronomia', 'Finanse', 'Produkcja']
+CONTRACT_TYPES = ['umowa o pracę', 'umowa zlecenie', 'kontrakt B2B', 'umowa o dzieło']
+WORK_MODES = ['stacjonarna', 'zdalna', 'hybrydowa']
+LEVELS = ['specjalista', 'młodszy specjalista', 'kierownik', 'asystent']
+
+# Elementy strony, których scraper nie czyta - nawigacja, skrypty, stopka
+PAGE_HEAD = '''<!DOCTYPE html>
+<html lang="pl"><head><meta charset="utf-8"><title>Praca - zatrudnię - ogłoszenia trojmiasto.pl</title>
+{scripts}
+</head><body>
+<header class="header"><nav class="nav">{nav}</nav></header>
+<main class="main">
+'''
+PAGE_FOOT = '''</main>
+<aside class="sidebar">{sidebar}</aside>
+<footer class="footer">{footer}</footer>
+</body></html>'''
+
+
+def _chrome(rng):
+    """Generuje elementy strony niezwiązane z ofertami"""
+    scripts = ''.join(
+        f'<script>window.__cfg{i} = {{"id": {rng.randint(1, 10**6)}, "flags": [{", ".join(str(rng.randint(0, 9)) for _ in range(40))}]}};</script>'
+        for i in range(20)
+    )
+    nav = ''.join('<ul class="nav__list">' + ''.join(
+        f'<li class="nav__item"><a class="nav__link" href="/kategoria-{i}-{j}/">Kategoria {i}.{j}</a></li>'
+        for j in range(15)) + '</ul>' for i in range(10))
+    sidebar = ''.join(f'<div class="banner"><a href="/reklama/{i}"><img src="/img/{i}.png" alt="Reklama {i}"></a></div>'
+                      for i in range(30))
+    footer = ''.join(f'<p class="footer__text">Informacja prawna {i}. ' + 'Lorem ipsum dolor sit amet. ' * 5 + '</p>'
+                     for i in range(20))
+    return scripts, nav, sidebar, footer
+
+
+def description(rng, n):
+    """Generuje opis oferty z wynagrodzeniem, liczbą godzin i harmonogramem pracy"""
+    low = rng.randint(3, 12)
+    parts = [
+        f'Poszukujemy pracownika na stanowisko nr {n}.',
+        'Zakres obowiązków: ' + ' '.join(rng.choice(['obsługa klienta,', 'prowadzenie dokumentacji,',
+                                                     'praca w zespole,', 'raportowanie,']) for _ in range(30)),
+        f'Kwota od {low} tys. do {low + rng.randint(1, 6)} tys.' if rng.random() < 0.7 else 'Wynagrodzenie do negocjacji.',
+        f'Około {rng.choice([80, 120, 160, 168])} h w miesiąc.' if rng.random() < 0.5 else '',
+        f'System {rng.choice(["2/2", "4/4", "5/2"])} dni.' if rng.random() < 0.4 else '',
+        'Oferujemy: ' + ' '.join(rng.choice(['karta sportowa,', 'opieka medyczna,', 'szkolenia,']) for _ in range(20)),
+    ]
+    return ' '.join(p for p in parts if p)
+
+
+def listing_page(page=1, per_page=30, base_url='https://ogloszenia.trojmiasto.pl', seed=0):
+    """Generuje stronę z listą ofert (elementy list__item)"""
+    rng = random.Random(seed * 1000 + page)
+    scripts, nav, sidebar, footer = _chrome(rng)
+    items = []
+    for i in range(per_page):
+        n = (page - 1) * per_page + i
+        items.append(
+            f'<div class="list__item list__item--premium" data-id="{n}">'
+            f'<div class="list__img"><img src="/img/ogl{n}.jpg" alt=""></div>'
+            f'<h2 class="list__title"><a href="{base_url}/praca-zatrudnie/stanowisko-{n}-ogl{6500000 + n}.html">'
+            f'Stanowisko {n}</a></h2>'
+            f'<div class="list__location">{rng.choice(CITIES)}</div>'
+            f'<div class="list__salary">{rng.randint(3, 12)} 000 zł</div>'
+            f'<div class="list__date">{1 + n % 28:02d}.10.2026</div>'
+            f'</div>'
+        )
+    return (PAGE_HEAD.format(scripts=scripts, nav=nav)
+            + '<div class="list">' + ''.join(items) + '</div>'
+            + PAGE_FOOT.format(sidebar=sidebar, footer=footer))
+
+
+def detail_page(n, seed=0):
+    """Generuje stronę oferty (ogl__description, oglDetails, topBar__item--address, oglStats)"""
+    rng = random.Random(seed * 1000003 + n)
+    scripts, nav, sidebar, footer = _chrome(rng)
+    fields = [
+        ('Branża', rng.choice(INDUSTRIES)),
+        ('Poziom stanowiska', rng.choice(LEVELS)),
+        ('Wymiar pracy', rng.choice(['pełny etat', 'część etatu'])),
+        ('Rodzaj umowy', rng.choice(CONTRACT_TYPES)),
+        ('Charakter pracy', rng.choice(WORK_MODES)),
+    ]
+    details = ''.join(
+        f'<div class="oglField"><div class="oglField__name">{name}</div>'
+        f'<div class="oglField__value">{value}</div></div>'
+        for name, value in fields
+    )
+    date = f'{1 + n % 28:02d}.10.2026'
+    body = (
+        f'<div class="topBar"><span class="topBar__item topBar__item--address">{rng.choice(CITIES)}</span></div>'
+        f'<div class="ogl__description">{description(rng, n)}</div>'
+        f'<div class="oglDetails">{details}</div>'
+        f'<div class="oglStats"><p>Data dodania: <span>{date}</span></p>'
+        f'<p>Aktualizacja: <span>{date}</span></p>'
+        f'<p>ID oferty: <span>{6500000 + n}</span></p></div>'
+    )
+    return PAGE_HEAD.format(scripts=scripts, nav=nav) + body + PAGE_FOOT.format(sidebar=sidebar, footer=footer)
@@ -0,0 +1,136 @@
+import json
+import sqlite3
+import threading
+import time
+
+
+class CrawlState:
+    """Stan scrapowania w SQLite - ukończone strony z listą ofert oraz oczekujące i nieudane oferty
+
+    Oferta trafia do stanu jako oczekująca, zanim pobierzemy jej szczegóły, a jako
+    zakończona oznaczamy ją dopiero po zapisie do bazy - przerwane scrapowanie można
+    wznowić bez ponownego pobierania ukończonych stron i bez gubienia ofert.
+    """
+
+    def __init__(self, path='crawl_state.sqlite', resume=False, max_attempts=3):
+        # resume - kontynuujemy zapisany stan zamiast zaczynać scrapowanie od nowa
+        # max_attempts - po tylu nieudanych próbach przestajemy ponawiać ofertę
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL - zapis stanu po każdej ofercie nie blokuje odczytów i jest tańszy
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        # Stan zapisany przed dodaniem źródeł ofert (bez kolumny source) nie nadaje się do wznowienia
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(pages)')]
+        if columns and 'source' not in columns:
+            self.conn.execute('DROP TABLE pages')
+            self.conn.execute('DROP TABLE IF EXISTS offers')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                source TEXT,
+                page INTEGER,
+                status TEXT,
+                updated_at REAL,
+                PRIMARY KEY (source, page)
+            )
+        ''')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS offers (
+                url TEXT PRIMARY KEY,
+                source TEXT,
+                listing TEXT,
+                status TEXT,
+                attempts INTEGER,
+                updated_at REAL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS offers_status ON offers (status)')
+        if not resume:
+            self.conn.execute('DELETE FROM pages')
+            self.conn.execute('DELETE FROM offers')
+        self.conn.commit()
+
+    def completed_pages(self, source):
+        """Zwraca numery stron z listą ofert źródła, które zostały w całości przetworzone"""
+        with self.lock:
+            return {page for page, in self.conn.execute(
+                "SELECT page FROM pages WHERE source = ? AND status = 'done'", (source,)
+            )}
+
+    def last_page(self):
+        """Zwraca numer ostatniej ukończonej strony z listą ofert lub None"""
+        with self.lock:
+            return self.conn.execute("SELECT MAX(page) FROM pages WHERE status = 'done'").fetchone()[0]
+
+    def known_urls(self):
+        """Zwraca adresy wszystkich ofert zapisanych w stanie (w dowolnym statusie)"""
+        with self.lock:
+            return {url for url, in self.conn.execute('SELECT url FROM offers')}
+
+    def set_page(self, source, page, status):
+        """Zapisuje status strony z listą ofert źródła ('done' lub 'failed')"""
+        with self.lock:
+            self.conn.execute('INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)', (source, page, status, time.time()))
+            self.conn.commit()
+
+    def add_pending(self, listing, source):
+        """Dodaje ofertę z listy ofert źródła jako oczekującą na pobranie szczegółów i zapis"""
+        with self.lock:
+            self.conn.execute(
+                '''INSERT INTO offers VALUES (?, ?, ?, 'pending', 0, ?)
+                   ON CONFLICT(url) DO UPDATE SET listing = excluded.listing, status = 'pending',
+                                                 updated_at = excluded.updated_at''',
+                (listing['url'], source, json.dumps(listing, ensure_ascii=False), time.time())
+            )
+            self.conn.commit()
+
+    def mark_failed(self, url):
+        """Oznacza ofertę, której szczegółów nie udało się pobrać - wróci do kolejki przy wznowieniu"""
+        with self.lock:
+            self.conn.execute(
+                "UPDATE offers SET status = 'failed', attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (time.time(), url)
+            )
+            self.conn.commit()
+
+    def mark_saved(self, urls):
+        """Oznacza oczekujące oferty zapisane w bazie jako zakończone (nieudane zostają nieudane)"""
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "UPDATE offers SET status = 'done', updated_at = ? WHERE url = ? AND status = 'pending'",
+                [(now, url) for url in urls]
+            )
+            self.conn.commit()
+
+    def requeue(self, source):
+        """Zwraca oferty źródła do ponownego pobrania: przerwane (oczekujące) i nieudane poniżej limitu prób"""
+        with self.lock:
+            rows = self.conn.execute(
+                '''SELECT listing FROM offers
+                   WHERE source = ? AND (status = 'pending' OR (status = 'failed' AND attempts < ?))
+                   ORDER BY rowid''',
+                (source, self.max_attempts)
+            ).fetchall()
+        return [json.loads(listing) for listing, in rows]
+
+    def summary(self):
+        """Zwraca liczbę ukończonych i nieudanych stron oraz ofert w każdym statusie"""
+        with self.lock:
+            pages = dict(self.conn.execute('SELECT status, COUNT(*) FROM pages GROUP BY status').fetchall())
+            offers = dict(self.conn.execute('SELECT status, COUNT(*) FROM offers GROUP BY status').fetchall())
+        return {
+            'pages_done': pages.get('done', 0),
+            'pages_failed': pages.get('failed', 0),
+            'last_page': self.last_page(),
+            'pending': offers.get('pending', 0),
+            'failed': offers.get('failed', 0),
+            'done': offers.get('done', 0),
+        }
+
+    def close(self):
+        """Zamyka plik stanu"""
+        with self.lock:
+            self.conn.close()
@@ -1,61 +1,867 @@
-from pymongo import MongoClient
+from bson import ObjectId
+from pymongo import MongoClient, UpdateOne, TEXT
+from pymongo.errors import BulkWriteError
 from datetime import datetime
+from itertools import islice
+import gzip
+import hashlib
+import json
+import queue
+import threading
+import time
 import pandas as pd
 import numpy as np
+from extraction import EXTRACTED_FIELDS, extract_fields_batch
+from dedup import LSHIndex, lsh_bands, minhash_signatures, signature_from_bytes, signature_to_bytes
+from instrumentation import metrics
+
+# pyarrow jest potrzebny tylko do eksportu w formacie Parquet
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
+# Kolumny eksportu w kolejności, w jakiej zapisuje je scraper
+EXPORT_COLUMNS = [
+    'title', 'location', 'url', 'offer_id', 'salary', 'date_posted', 'date_updated', 'work_mode',
+    'contract_type', 'work_time', 'industry', 'position_level', 'description', 'salary_range',
+    'monthly_hours', 'work_schedule', 'scraped_date', 'source', 'saved_to_db',
+]
+
+# Pola, dla których utrzymujemy liczniki w kolekcji job_stats
+STATS_FIELDS = ['contract_type', 'work_mode', 'industry', 'position_level', 'location', 'salary', 'work_time']
+# Pola oferty potrzebne do wyliczenia jej wkładu w statystyki
+STATS_PROJECTION = {'_id': 0, 'url': 1, 'benefits': 1, 'date_posted': 1, 'salary_range': 1, 'duplicate_of': 1,
+                    **{field: 1 for field in STATS_FIELDS}}
+# Pola treści oferty, z których liczymy content_hash - bez dat scrapowania i zapisu oraz źródła
+# (hashe ofert zapisanych przed dodaniem źródeł pozostają ważne), a opis reprezentuje jego hash
+# (nie musimy pobierać opisów z bazy, żeby porównać wersje)
+CONTENT_FIELDS = [column for column in EXPORT_COLUMNS
+                  if column not in ('description', 'scraped_date', 'source', 'saved_to_db')]
+CONTENT_FIELDS += ['benefits', 'description_hash']
+# Poprzednie wersje ofert pobierane przed zapisem - do porównania hashy, statystyk i historii
+EXISTING_PROJECTION = {**STATS_PROJECTION, 'content_hash': 1, 'lsh_bands': 1, **{field: 1 for field in CONTENT_FIELDS}}
+# Pola, według których filtrujemy wyniki wyszukiwania (search), i pola zwracane w wynikach (bez opisu)
+SEARCH_FACETS = ['industry', 'location', 'contract_type', 'work_mode']
+SEARCH_PROJECTION = {field: 1 for field in ['title', 'url', 'location', 'salary', 'salary_range', 'industry',
+                                            'contract_type', 'work_mode', 'position_level', 'date_posted',
+                                            'source', 'duplicate_of']}
+# Wyszukiwanie pełnotekstowe zwraca najwyżej tyle najlepiej dopasowanych ofert - kolejne strony
+# pomijają poprzednie wyniki, więc koszt strony nie przekracza tego limitu
+TEXT_MAX_RESULTS = 200
+# explain_search zgłasza zapytanie, które przegląda ponad tyle razy więcej dokumentów, niż potrzebuje
+EXPLAIN_MAX_DOCS_RATIO = 10
+
+
+def description_hash(description):
+    """Zwraca hash opisu oferty (None dla oferty bez opisu)"""
+    if description is None:
+        return None
+    return hashlib.blake2b(description.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def _receive(jobs_data, timeout):
+    """Odbiera oferty z jobs_data w osobnym wątku - zwraca None, gdy przez timeout() sekund nie było oferty"""
+    items = queue.Queue(maxsize=1000)
+    stop = threading.Event()
+
+    def put(item):
+        # Po zakończeniu odbioru (stop) nie czekamy na miejsce w kolejce
+        while not stop.is_set():
+            try:
+                items.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce():
+        jobs = iter(jobs_data)
+        try:
+            for job in jobs:
+                if not put(('job', job)):
+                    break
+        except BaseException as e:
+            put(('error', e))
+        else:
+            put(('done', None))
+        finally:
+            if hasattr(jobs, 'close'):
+                jobs.close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    try:
+        while True:
+            try:
+                kind, value = items.get(timeout=timeout())
+            except queue.Empty:
+                yield None
+                continue
+            if kind == 'done':
+                return
+            if kind == 'error':
+                raise value
+            yield value
+    finally:
+        stop.set()
+        thread.join()
+
+
+def iter_batches(jobs_data, batch_size, flush_interval=None):
+    """Dzieli oferty na paczki (URL -> oferta) po batch_size ofert - paczka czeka najwyżej flush_interval sekund
+
+    Przy flush_interval oferty odbieramy w osobnym wątku, więc paczka trafia do zapisu
+    po flush_interval sekundach od pierwszej oferty także wtedy, gdy źródło ofert (np.
+    scraper czekający na Retry-After) długo nie przekazuje kolejnej oferty. Zebraną
+    paczkę zwracamy także wtedy, gdy źródło ofert zakończy się błędem.
+    """
+    batch = {}
+    deadline = None
+    if flush_interval is None:
+        jobs = iter(jobs_data)
+    else:
+        jobs = _receive(jobs_data, lambda: None if deadline is None else max(0, deadline - time.monotonic()))
+    try:
+        for job in jobs:
+            if job is not None:
+                # Duplikaty URL w jednej paczce zastępujemy ostatnią wersją oferty,
+                # żeby równoległe upserty nie kolidowały na unikalnym indeksie
+                batch[job['url']] = job
+                if deadline is None and flush_interval is not None:
+                    deadline = time.monotonic() + flush_interval
+            if batch and (len(batch) >= batch_size or (deadline is not None and time.monotonic() >= deadline)):
+                yield batch
+                batch, deadline = {}, None
+    except GeneratorExit:
+        raise
+    except BaseException:
+        if batch:
+            yield batch
+        raise
+    finally:
+        if hasattr(jobs, 'close'):
+            jobs.close()
+    if batch:
+        yield batch
+
+
+def content_hash(job):
+    """Zwraca stabilny hash pól treści oferty (CONTENT_FIELDS) - zmienia się tylko przy zmianie oferty"""
+    content = {field: job.get(field) for field in CONTENT_FIELDS}
+    serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.blake2b(serialized.encode('utf-8'), digest_size=16).hexdigest()
+
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, batch_size=500, uri='mongodb://localhost:27017/', db_name='job_scraper_db', client=None):
         print("Inicjalizacja połączenia z MongoDB...")
-        # Tworzymy połączenie z lokalną bazą MongoDB
-        self.client = MongoClient('mongodb://localhost:27017/')
+        # Tworzymy połączenie z lokalną bazą MongoDB (albo korzystamy z podanego klienta, np. mongomock)
+        self.client = client or MongoClient(uri)
         # Tworzymy/wybieramy bazę danych
-        self.db = self.client['job_scraper_db']
+        self.db = self.client[db_name]
         # Tworzymy/wybieramy kolekcję
         self.jobs = self.db['jobs']
+        # Unikalny indeks na URL - upsert po url korzysta z indeksu zamiast skanować kolekcję
+        self.jobs.create_index('url', unique=True)
+        # Indeks pasm LSH sygnatur opisów - kandydatów na duplikaty szukamy bez skanowania kolekcji
+        self.jobs.create_index('lsh_bands')
+        # Indeksy wyszukiwania: pełnotekstowy na tytule i opisie (bez stemmingu - MongoDB nie obsługuje
+        # języka polskiego) oraz złożone indeksy filtrów w kolejności równość (pole filtra), sortowanie
+        # (_id - kolejność wyników i kursor) i zakres (wynagrodzenie) - także bez pola filtra
+        self.jobs.create_index([('title', TEXT), ('description', TEXT)], weights={'title': 5},
+                               default_language='none', name='search_text')
+        for field in SEARCH_FACETS:
+            self.jobs.create_index([(field, 1), ('_id', -1), ('salary_range.min', 1)])
+        # Starszy indeks (wynagrodzenie, _id) wymagał sortowania wyników w pamięci - zastępujemy go
+        if 'salary_range.min_1__id_-1' in self.jobs.index_information():
+            self.jobs.drop_index('salary_range.min_1__id_-1')
+        self.jobs.create_index([('_id', -1), ('salary_range.min', 1)])
+        # Liczba operacji wysyłanych do bazy w jednym bulk_write
+        self.batch_size = batch_size
+        # Statystyki ofert aktualizowane przy każdym zapisie ($inc) - podsumowanie
+        # nie wymaga przeliczania całej kolekcji
+        self.job_stats = self.db['job_stats']
+        # Kolejne wersje ofert (bez pełnych opisów) - do analizy zmian wynagrodzeń i warunków w czasie
+        self.job_history = self.db['job_history']
+        self.job_history.create_index([('url', 1), ('valid_from', 1)])
+        # Przeliczamy statystyki także wtedy, gdy brakuje licznika unikalnych ofert (starsze bazy)
+        if self.jobs.estimated_document_count() > 0 and (
+                self.job_stats.estimated_document_count() == 0
+                or self.job_stats.find_one({'_id': {'dim': 'unique', 'value': None}}) is None):
+            self.rebuild_stats()
         
-    def save_jobs(self, jobs_data):
-        """Zapisuje listę ofert pracy do bazy danych"""
+    def save_jobs(self, jobs_data, batch_size=None, flush_interval=None, on_saved=None):
+        """Zapisuje oferty pracy do bazy danych (upsert po URL w paczkach)
+
+        jobs_data może być listą lub generatorem (np. JobScraper.iter_jobs). Paczkę
+        zapisujemy co batch_size ofert, a najpóźniej flush_interval sekund po jej pierwszej
+        ofercie, więc pamięć nie rośnie z liczbą ofert, a zapisane paczki przetrwają błąd
+        w trakcie scrapowania.
+        on_saved (np. CrawlState.mark_saved) dostaje adresy ofert z każdej zapisanej paczki.
+        """
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
         if not jobs_data:
-            return 0
-            
-        saved_count = 0
-        for job in jobs_data:
-            # Dodajemy datę zapisu
-            job['saved_to_db'] = datetime.now()
-            
-            # Sprawdzamy czy oferta już istnieje (po URL)
-            existing_job = self.jobs.find_one({'url': job['url']})
-            
-            if existing_job:
-                # Aktualizujemy istniejącą ofertę
-                self.jobs.update_one(
-                    {'url': job['url']},
-                    {'$set': job}
-                )
-            else:
-                # Dodajemy nową ofertę
-                self.jobs.insert_one(job)
-            saved_count += 1
+            return counts
+            
+        batch_size = batch_size or self.batch_size
+        try:
+            # Resztę ofert zapisujemy także wtedy, gdy źródło ofert zakończyło się błędem (iter_batches)
+            for batch in iter_batches(jobs_data, batch_size, flush_interval):
+                # Dodajemy datę zapisu
+                saved_to_db = datetime.now()
+                for job in batch.values():
+                    job['saved_to_db'] = saved_to_db
+                self._flush_batch(batch, counts, on_saved)
+        finally:
+            print(f"Zapisano {sum(counts.values())} ofert w bazie danych "
+                  f"(nowe: {counts['inserted']}, zaktualizowane: {counts['updated']}, bez zmian: {counts['unchanged']})")
+        return counts
+        
+    def _flush_batch(self, batch, counts, on_saved=None):
+        """Zapisuje paczkę ofert i przekazuje adresy zapisanych ofert do on_saved"""
+        with metrics.timer('save_jobs'):
+            saved_urls = self._write_batch(batch.values(), counts)
+        if on_saved:
+            on_saved(saved_urls)
+            
+    def _write_batch(self, jobs, counts):
+        """Wysyła paczkę upsertów do bazy jednym zapytaniem, aktualizuje liczniki i zwraca adresy zapisanych ofert
+
+        Oferty z niezmienionym content_hash pomijamy (bez zapisu), a każdą nową wersję
+        oferty dopisujemy do kolekcji job_history. jobs mogą zawierać tylko część pól
+        (np. z reextract_fields) - hash liczymy z poprzedniej wersji uzupełnionej o nowe pola.
+        """
+        jobs = list(jobs)
+        # Poprzednie wersje ofert z paczki (jedno zapytanie po indeksie url) - do porównania hashy i statystyk
+        with metrics.timer('save_jobs.load_existing'):
+            existing = {job['url']: job for job in self.jobs.find({'url': {'$in': [job['url'] for job in jobs]}}, EXISTING_PROJECTION)}
+        
+        saved_urls = []
+        changed = []
+        for job in jobs:
+            old_job = existing.get(job['url'])
+            if 'description' in job:
+                job['description_hash'] = description_hash(job['description'])
+            job['content_hash'] = content_hash({**(old_job or {}), **job})
+            if old_job and old_job.get('content_hash') == job['content_hash']:
+                counts['unchanged'] += 1
+                saved_urls.append(job['url'])
+                continue
+            changed.append(job)
+        metrics.increment('db.jobs_unchanged', len(jobs) - len(changed))
+        metrics.increment('db.jobs_written', len(changed))
+        if not changed:
+            return saved_urls
+        # Sygnatury liczymy tylko dla nowych opisów - zmiana innych pól nie zmienia grupy duplikatów
+        with metrics.timer('save_jobs.dedup'):
+            self._mark_duplicates([
+                job for job in changed if 'description' in job and not (
+                    job['url'] in existing and existing[job['url']].get('lsh_bands') is not None
+                    and existing[job['url']].get('description_hash') == job['description_hash'])
+            ])
+        
+        operations = [UpdateOne({'url': job['url']}, {'$set': job}, upsert=True) for job in changed]
+        failed = set()
+        try:
+            with metrics.timer('save_jobs.bulk_write'):
+                result = self.jobs.bulk_write(operations, ordered=False).bulk_api_result
+        except BulkWriteError as e:
+            # Przy ordered=False pozostałe operacje zostały wykonane - liczymy je mimo błędu
+            result = e.details
+            failed = {error['index'] for error in result.get('writeErrors', [])}
+            print(f"Błąd podczas zapisu {len(failed)} ofert: {e}")
+        counts['inserted'] += result.get('nUpserted', 0)
+        counts['updated'] += result.get('nModified', 0)
+        counts['unchanged'] += result.get('nMatched', 0) - result.get('nModified', 0)
+        
+        # Zmiana statystyk: odejmujemy poprzednią wersję oferty i dodajemy nową
+        deltas = {}
+        history = []
+        for index, job in enumerate(changed):
+            if index in failed:
+                continue
+            saved_urls.append(job['url'])
+            old_job = existing.get(job['url'])
+            if old_job:
+                self._add_stats(deltas, old_job, -1)
+            new_job = {**(old_job or {}), **job}
+            self._add_stats(deltas, new_job, 1)
+            history.append(self._history_entry(old_job, new_job))
+        self._apply_stats(deltas)
+        if history:
+            with metrics.timer('save_jobs.history'):
+                self.job_history.insert_many(history, ordered=False)
+        return saved_urls
+        
+    def _mark_duplicates(self, jobs):
+        """Liczy sygnatury MinHash opisów i oznacza oferty będące duplikatami (duplicate_of)
+
+        Kandydatów pobieramy jednym zapytaniem po indeksie lsh_bands - tylko oferty
+        ze wspólnym pasmem LSH, a nie wszystkie zapisane opisy. duplicate_of wskazuje
+        URL pierwszej oferty grupy duplikatów (None dla oferty unikalnej).
+        """
+        if not jobs:
+            return
+        signatures = minhash_signatures([job['description'] for job in jobs])
+        bands = [lsh_bands(signature) if signature is not None else [] for signature in signatures]
+        all_bands = sorted({band for job_bands in bands for band in job_bands})
+        
+        index = LSHIndex()
+        if all_bands:
+            # Pomijamy poprzednie wersje ofert z paczki - oferta nie jest duplikatem samej siebie
+            query = {'lsh_bands': {'$in': all_bands}, 'url': {'$nin': [job['url'] for job in jobs]}}
+            projection = {'_id': 0, 'url': 1, 'minhash': 1, 'lsh_bands': 1, 'duplicate_of': 1}
+            for doc in self.jobs.find(query, projection).sort('_id', 1):
+                index.add(doc['url'], signature_from_bytes(doc['minhash']), doc.get('duplicate_of'), doc['lsh_bands'])
+                
+        for job, signature, job_bands in zip(jobs, signatures, bands):
+            if signature is None:
+                job.update(minhash=None, lsh_bands=[], duplicate_of=None)
+                continue
+            # Duplikaty szukamy także wśród wcześniejszych ofert z tej samej paczki
+            cluster = index.query(signature, job_bands)
+            # Oferta z nowym opisem może trafić na własne duplikaty - nadal jest pierwszą ofertą grupy
+            job['duplicate_of'] = cluster if cluster != job['url'] else None
+            job['minhash'] = signature_to_bytes(signature)
+            job['lsh_bands'] = job_bands
+            index.add(job['url'], signature, job['duplicate_of'], job_bands)
+        metrics.increment('db.duplicates', sum(1 for job in jobs if job.get('duplicate_of')))
+        
+    def find_duplicates(self, batch_size=None):
+        """Przelicza sygnatury i grupy duplikatów wszystkich zapisanych ofert (w kolejności zapisu) i statystyki"""
+        batch_size = batch_size or self.batch_size
+        print("Szukam duplikatów ofert...")
+        index = LSHIndex()
+        duplicates = 0
+        cursor = self.jobs.find({}, {'_id': 0, 'url': 1, 'description': 1}, batch_size=batch_size).sort('_id', 1)
+        while True:
+            chunk = list(islice(cursor, batch_size))
+            if not chunk:
+                break
+            signatures = minhash_signatures([job.get('description') for job in chunk])
+            operations = []
+            for job, signature in zip(chunk, signatures):
+                update = {'minhash': None, 'lsh_bands': [], 'duplicate_of': None}
+                if signature is not None:
+                    job_bands = lsh_bands(signature)
+                    update.update(minhash=signature_to_bytes(signature), lsh_bands=job_bands,
+                                  duplicate_of=index.query(signature, job_bands))
+                    index.add(job['url'], signature, update['duplicate_of'], job_bands)
+                duplicates += update['duplicate_of'] is not None
+                operations.append(UpdateOne({'url': job['url']}, {'$set': update}))
+            self.jobs.bulk_write(operations, ordered=False)
+        print(f"Znaleziono {duplicates} duplikatów ofert")
+        self.rebuild_stats()
+        return duplicates
+        
+    @staticmethod
+    def _history_entry(old_job, new_job):
+        """Buduje wpis historii oferty - pola treści nowej wersji i lista pól zmienionych względem poprzedniej"""
+        entry = {field: new_job.get(field) for field in CONTENT_FIELDS}
+        entry['content_hash'] = new_job['content_hash']
+        entry['previous_hash'] = old_job.get('content_hash') if old_job else None
+        entry['changed_fields'] = (
+            [field for field in CONTENT_FIELDS if old_job.get(field) != new_job.get(field)] if old_job else None
+        )
+        entry['valid_from'] = new_job.get('saved_to_db') or datetime.now()
+        return entry
+        
+    @staticmethod
+    def _add_stats(deltas, job, sign):
+        """Dodaje (sign=1) lub odejmuje (sign=-1) wkład oferty w liczniki statystyk"""
+        def add(dim, value, **counters):
+            key = (dim, value)
+            entry = deltas.setdefault(key, {})
+            for name, amount in counters.items():
+                entry[name] = entry.get(name, 0) + sign * amount
+                
+        add('total', None, count=1)
+        if not job.get('duplicate_of'):
+            add('unique', None, count=1)
+        for field in STATS_FIELDS:
+            if job.get(field) is not None:
+                add(field, job[field], count=1)
+        for benefit in job.get('benefits') or []:
+            add('benefits', benefit, count=1)
+            
+        try:
+            day = datetime.strptime(job.get('date_posted') or '', '%d.%m.%Y').strftime('%Y-%m-%d')
+        except ValueError:
+            day = None
+        if day:
+            add('day', day, count=1)
+            if job.get('industry') is not None:
+                add('industry_day', (job['industry'], day), count=1)
+                
+        salary_range = job.get('salary_range') or {}
+        for bound in ('min', 'max'):
+            value = salary_range.get(bound)
+            if isinstance(value, (int, float)):
+                # Liczności kwot (do mediany) oraz sumy i sumy kwadratów (do średniej i odchylenia)
+                add(f'salary_{bound}', value, count=1)
+                add('salary_totals', bound, count=1, sum=value, sum_sq=value * value)
+                
+    def _apply_stats(self, deltas):
+        """Zapisuje zmiany liczników statystyk jednym bulk_write"""
+        operations = []
+        for (dim, value), counters in deltas.items():
+            counters = {name: amount for name, amount in counters.items() if amount}
+            if counters:
+                value = list(value) if isinstance(value, tuple) else value
+                operations.append(UpdateOne({'_id': {'dim': dim, 'value': value}}, {'$inc': counters}, upsert=True))
+        if operations:
+            with metrics.timer('save_jobs.update_stats'):
+                self.job_stats.bulk_write(operations, ordered=False)
             
-        print(f"Zapisano {saved_count} ofert w bazie danych")
-        return saved_count
+    def rebuild_stats(self):
+        """Przelicza statystyki od zera na podstawie wszystkich ofert i zwraca liczbę rozbieżnych liczników"""
+        print("Przeliczam statystyki ofert...")
+        deltas = {}
+        for job in self.jobs.find({}, STATS_PROJECTION, batch_size=self.batch_size):
+            self._add_stats(deltas, job, 1)
+            
+        # Porównujemy przeliczone liczniki z zapisanymi, żeby wykryć rozbieżności
+        stored = {}
+        for doc in self.job_stats.find():
+            value = doc['_id']['value']
+            key = (doc['_id']['dim'], tuple(value) if isinstance(value, list) else value)
+            stored[key] = {name: amount for name, amount in doc.items() if name != '_id' and amount}
+        rebuilt = {key: {name: amount for name, amount in counters.items() if amount} for key, counters in deltas.items()}
+        mismatches = sum(1 for key in set(stored) | set(rebuilt) if stored.get(key, {}) != rebuilt.get(key, {}))
+        
+        self.job_stats.delete_many({})
+        self._apply_stats(deltas)
+        print(f"Przeliczono statystyki ({len(rebuilt)} liczników, rozbieżności: {mismatches})")
+        return mismatches
+        
+    def reextract_fields(self, batch_size=None):
+        """Ponownie wyciąga salary_range, monthly_hours i work_schedule z opisów zapisanych ofert, bez scrapowania"""
+        batch_size = batch_size or self.batch_size
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        cursor = self.jobs.find({'description': {'$type': 'string'}}, {'_id': 0, 'url': 1, 'description': 1},
+                                batch_size=batch_size)
+        while True:
+            chunk = list(islice(cursor, batch_size))
+            if not chunk:
+                break
+            df = pd.DataFrame(chunk)
+            extracted = extract_fields_batch(df['description'])
+            extracted['url'] = df['url']
+            # Zapis przez _write_batch aktualizuje też statystyki zależne od wynagrodzeń
+            self._write_batch(extracted[['url'] + EXTRACTED_FIELDS].to_dict('records'), counts)
+        print(f"Ponownie przetworzono opisy {sum(counts.values())} ofert (zmienione: {counts['updated']})")
+        return counts
+        
+    def get_known_offers(self):
+        """Zwraca daty dodania i aktualizacji zapisanych ofert według URL i ID oferty"""
+        known_offers = {}
+        # Jedno zapytanie z projekcją - nie pobieramy opisów ofert
+        projection = {'_id': 0, 'url': 1, 'offer_id': 1, 'date_posted': 1, 'date_updated': 1}
+        for job in self.jobs.find({}, projection):
+            dates = {job.get('date_updated'), job.get('date_posted')} - {None}
+            known_offers[job['url']] = dates
+            if job.get('offer_id'):
+                known_offers[job['offer_id']] = dates
+        return known_offers
+        
+    def get_job_history(self, url):
+        """Zwraca kolejne wersje oferty (od najstarszej) z kolekcji job_history"""
+        return list(self.job_history.find({'url': url}, {'_id': 0}).sort('valid_from', 1))
         
     def get_jobs_count(self):
         """Zwraca liczbę ofert w bazie danych"""
         return self.jobs.count_documents({})
         
-    def export_to_csv(self, filename):
-        """Eksportuje dane z bazy do pliku CSV"""
-        jobs_data = list(self.jobs.find({}, {'_id': 0, 'company': 0}))  # pomijamy pola _id i company
-        if jobs_data:
-            df = pd.DataFrame(jobs_data)
-            df.to_csv(filename, index=False, encoding='utf-8')
-            print(f"Wyeksportowano {len(jobs_data)} ofert do pliku {filename}")
-            return len(jobs_data)
-        return 0
-        
-    def get_jobs_summary(self):
-        """Zwraca podsumowanie ofert z bazy danych"""
+    def search(self, text=None, filters=None, salary_min=None, salary_max=None, limit=20, cursor=None):
+        """Wyszukuje oferty po słowach kluczowych, filtrach i zakresie wynagrodzenia
+
+        filters to słownik pól z SEARCH_FACETS (wartość lub lista wartości), a salary_min
+        i salary_max ograniczają dolną granicę wynagrodzenia (salary_range.min). Zwraca
+        oferty i kursor następnej strony (next_cursor, None na ostatniej stronie).
+
+        Bez słów kluczowych wyniki sortujemy od najnowszych (_id) indeksem, a kursorem jest
+        _id ostatniej oferty. Wyniki wyszukiwania pełnotekstowego zwracamy w kolejności indeksu
+        tekstowego (od najlepiej dopasowanych), bez sortowania w pamięci - najwyżej
+        TEXT_MAX_RESULTS ofert, a kursorem jest liczba ofert z poprzednich stron.
+        """
+        find, offset, limit = self._search_find(text, filters, salary_min, salary_max, max(1, limit), cursor)
+        with metrics.timer('search'):
+            jobs = list(find)
+        next_cursor = None
+        if len(jobs) > limit:
+            if not text:
+                next_cursor = str(jobs[limit - 1]['_id'])
+            elif offset + limit < TEXT_MAX_RESULTS:
+                next_cursor = str(offset + limit)
+        jobs = jobs[:limit]
+        for job in jobs:
+            del job['_id']
+        return {'results': jobs, 'next_cursor': next_cursor}
+        
+    def explain_search(self, text=None, filters=None, salary_min=None, salary_max=None, limit=20, cursor=None):
+        """Zwraca plan zapytania search: etapy planu, użyte indeksy, liczbę przejrzanych kluczy i dokumentów
+        oraz problemy planu (problems) - skanowanie kolekcji, sortowanie wyników w pamięci i przeglądanie
+        ponad EXPLAIN_MAX_DOCS_RATIO razy więcej dokumentów, niż wymaga strona wyników
+        """
+        find, offset, _ = self._search_find(text, filters, salary_min, salary_max, max(1, limit), cursor)
+        explain = find.explain()
+        winning_plan = explain['queryPlanner']['winningPlan']
+        # Nowsze wersje MongoDB (silnik SBE) zagnieżdżają plan w queryPlan
+        stages, indexes = [], []
+        plans = [winning_plan.get('queryPlan', winning_plan)]
+        while plans:
+            plan = plans.pop(0)
+            stages.append(plan['stage'])
+            if plan.get('indexName'):
+                indexes.append(plan['indexName'])
+            plans += plan.get('inputStages', []) + ([plan['inputStage']] if 'inputStage' in plan else [])
+        stats = explain.get('executionStats', {})
+        docs_examined = stats.get('totalDocsExamined')
+        returned = stats.get('nReturned')
+        problems = []
+        if 'COLLSCAN' in stages:
+            problems.append('skanowanie całej kolekcji (COLLSCAN)')
+        if 'SORT' in stages:
+            problems.append('sortowanie wyników w pamięci (SORT)')
+        # Pominięte oferty poprzednich stron wyszukiwania pełnotekstowego też trzeba przejrzeć
+        if docs_examined is not None and docs_examined > EXPLAIN_MAX_DOCS_RATIO * max(offset + (returned or 0), 1):
+            problems.append(f"przejrzano {docs_examined} dokumentów dla {returned} wyników")
+        return {
+            'stages': stages,
+            'indexes': indexes,
+            'collscan': 'COLLSCAN' in stages,
+            'blocking_sort': 'SORT' in stages,
+            'problems': problems,
+            'keys_examined': stats.get('totalKeysExamined'),
+            'docs_examined': docs_examined,
+            'returned': returned,
+            'time_ms': stats.get('executionTimeMillis'),
+        }
+        
+    def _search_find(self, text, filters, salary_min, salary_max, limit, cursor):
+        """Buduje zapytanie find dla search i zwraca je razem z liczbą pominiętych ofert i limitem strony"""
+        if not text:
+            query = self._search_query(text, filters, salary_min, salary_max, cursor)
+            return self.jobs.find(query, SEARCH_PROJECTION).sort('_id', -1).limit(limit + 1), 0, limit
+        if cursor and not (cursor.isdigit() and int(cursor) < TEXT_MAX_RESULTS):
+            raise ValueError(f"Nieprawidłowy kursor wyników: {cursor}")
+        offset = int(cursor or 0)
+        limit = min(limit, TEXT_MAX_RESULTS - offset)
+        # Bez sortowania i bez textScore MongoDB czyta indeks tekstowy strumieniowo i kończy po limicie
+        query = self._search_query(text, filters, salary_min, salary_max, None)
+        return self.jobs.find(query, SEARCH_PROJECTION).skip(offset).limit(limit + 1), offset, limit
+        
+    @staticmethod
+    def _search_query(text, filters, salary_min, salary_max, cursor):
+        """Buduje zapytanie MongoDB dla search"""
+        query = {}
+        if text:
+            query['$text'] = {'$search': text}
+        for field, value in (filters or {}).items():
+            if field not in SEARCH_FACETS:
+                raise ValueError(f"Nieznane pole filtra: {field} (dostępne: {', '.join(SEARCH_FACETS)})")
+            if isinstance(value, (list, tuple, set)):
+                query[field] = {'$in': list(value)}
+            elif value is not None:
+                query[field] = value
+        salary = {}
+        if salary_min is not None:
+            salary['$gte'] = salary_min
+        if salary_max is not None:
+            salary['$lte'] = salary_max
+        if salary:
+            query['salary_range.min'] = salary
+        if cursor:
+            if not ObjectId.is_valid(cursor):
+                raise ValueError(f"Nieprawidłowy kursor wyników: {cursor}")
+            query['_id'] = {'$lt': ObjectId(cursor)}
+        return query
+        
+    def export_to_csv(self, filename, columns=None, query=None, since=None, file_format=None, batch_size=1000):
+        """Eksportuje dane z bazy do pliku CSV, CSV skompresowanego gzip lub Parquet
+
+        Oferty czytamy kursorem i zapisujemy paczkami po batch_size, więc zużycie pamięci
+        zależy od rozmiaru paczki, a nie od liczby ofert w bazie. columns ogranicza
+        eksport do wybranych pól, query i since (scraped_date od podanej daty) - do
+        wybranych ofert.
+        """
+        columns = list(columns or EXPORT_COLUMNS)
+        query = dict(query or {})
+        if since:
+            # scraped_date zapisujemy jako "YYYY-MM-DD HH:MM:SS", więc porównanie napisów wystarcza
+            query['scraped_date'] = {'$gte': since}
+        file_format = file_format or self._export_format(filename)
+        
+        projection = {'_id': 0, **{column: 1 for column in columns}}
+        cursor = self.jobs.find(query, projection, batch_size=batch_size)
+        exported = 0
+        writer = None
+        try:
+            while True:
+                chunk = list(islice(cursor, batch_size))
+                if not chunk:
+                    break
+                df = pd.DataFrame(chunk).reindex(columns=columns)
+                if file_format == 'parquet':
+                    table = self._to_arrow(df)
+                    if writer is None:
+                        writer = pq.ParquetWriter(filename, table.schema)
+                    writer.write_table(table)
+                else:
+                    if writer is None:
+                        opener = gzip.open if file_format == 'csv.gz' else open
+                        writer = opener(filename, 'wt', encoding='utf-8', newline='')
+                    df.to_csv(writer, index=False, header=exported == 0)
+                exported += len(chunk)
+        finally:
+            cursor.close()
+            if writer is not None:
+                writer.close()
+                
+        if exported:
+            print(f"Wyeksportowano {exported} ofert do pliku {filename}")
+        return exported
+        
+    @staticmethod
+    def _export_format(filename):
+        """Rozpoznaje format eksportu po rozszerzeniu pliku"""
+        if filename.endswith('.parquet'):
+            return 'parquet'
+        if filename.endswith('.gz'):
+            return 'csv.gz'
+        return 'csv'
+        
+    @staticmethod
+    def _to_arrow(df):
+        """Zamienia paczkę ofert na tabelę Arrow o stałym schemacie, niezależnym od zawartości paczki"""
+        if pa is None:
+            raise RuntimeError("Eksport do formatu Parquet wymaga pakietu pyarrow")
+        arrays, fields = [], []
+        for column in df.columns:
+            values = df[column]
+            if column == 'saved_to_db':
+                arrays.append(pa.array(pd.to_datetime(values), type=pa.timestamp('ms')))
+            elif column == 'monthly_hours':
+                arrays.append(pa.array(pd.to_numeric(values), type=pa.float64()))
+            else:
+                # Słowniki (np. salary_range) zapisujemy jako JSON, pozostałe pola jako tekst
+                values = [json.dumps(v, ensure_ascii=False) if isinstance(v, (dict, list))
+                          else None if v is None or v != v else str(v) for v in values]
+                arrays.append(pa.array(values, type=pa.string()))
+            fields.append(pa.field(column, arrays[-1].type))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+        
+    def get_jobs_summary(self, backend='stats'):
+        """Zwraca podsumowanie ofert z bazy danych
+
+        backend='stats' czyta liczniki utrzymywane przy zapisie w kolekcji job_stats,
+        więc czas odczytu nie zależy od liczby ofert. backend='aggregate' liczy
+        statystyki po stronie MongoDB - przez sieć przesyłamy tylko zagregowane wyniki.
+        backend='pandas' pobiera wszystkie oferty i liczy statystyki w pandas.
+        """
+        with metrics.timer(f'get_jobs_summary.{backend}'):
+            if backend == 'stats':
+                return self._get_jobs_summary_stats()
+            if backend == 'pandas':
+                return self._get_jobs_summary_pandas()
+            if backend == 'aggregate':
+                return self._get_jobs_summary_aggregate()
+        raise ValueError(f"Nieznany backend podsumowania: {backend}")
+        
+    def _get_jobs_summary_aggregate(self):
+        """Liczy podsumowanie ofert jednym potokiem agregacji MongoDB"""
+        def count_by(field):
+            # Odpowiednik value_counts() - pomijamy brakujące wartości
+            return [{'$match': {field: {'$ne': None}}}, {'$sortByCount': f'${field}'}]
+            
+        def salary_buckets(field):
+            # Kwoty wynagrodzeń to pełne tysiące, więc liczba różnych wartości jest mała,
+            # a z ich liczności policzymy dokładnie średnią, medianę i odchylenie standardowe
+            return [{'$match': {field: {'$type': 'number'}}}, {'$group': {'_id': f'${field}', 'count': {'$sum': 1}}}]
+            
+        pipeline = [{'$facet': {
+            'total_jobs': [{'$count': 'count'}],
+            'unique_jobs': [{'$match': {'duplicate_of': None}}, {'$count': 'count'}],
+            'contract_types': count_by('contract_type'),
+            'locations': count_by('location'),
+            'work_modes': count_by('work_mode'),
+            'industries': count_by('industry'),
+            'position_levels': count_by('position_level'),
+            'salaries': count_by('salary'),
+            'work_times': count_by('work_time'),
+            'benefits': [{'$unwind': '$benefits'}, {'$sortByCount': '$benefits'}],
+            'min_salaries': salary_buckets('salary_range.min'),
+            'max_salaries': salary_buckets('salary_range.max'),
+            'industry_by_date': [
+                {'$match': {'industry': {'$ne': None}, 'date_posted': {'$type': 'string'}}},
+                {'$project': {'industry': 1, 'day': {'$dateFromString': {
+                    'dateString': '$date_posted', 'format': '%d.%m.%Y', 'onError': None, 'onNull': None
+                }}}},
+                {'$match': {'day': {'$ne': None}}},
+                {'$group': {'_id': {'industry': '$industry', 'day': '$day'}, 'count': {'$sum': 1}}},
+            ],
+        }}]
+        facets = next(self.jobs.aggregate(pipeline))
+        
+        def to_dict(rows, limit=None):
+            return {row['_id']: row['count'] for row in rows[:limit]}
+            
+        total_jobs = facets['total_jobs'][0]['count'] if facets['total_jobs'] else 0
+        
+        # Podstawowe statystyki
+        summary = {
+            'total_jobs': total_jobs,
+            'unique_jobs': facets['unique_jobs'][0]['count'] if facets['unique_jobs'] else 0,
+            'contract_types': to_dict(facets['contract_types']),
+            'jobs_by_location': to_dict(facets['locations'], 10),
+            'work_modes': to_dict(facets['work_modes']),
+            'industries': to_dict(facets['industries']),
+            'position_levels': to_dict(facets['position_levels']),
+            'benefits_distribution': to_dict(facets['benefits']),
+            'salary_stats': to_dict(facets['salaries']),
+        }
+        
+        # Statystyki wynagrodzeń z liczności poszczególnych kwot
+        if facets['min_salaries'] and facets['max_salaries']:
+            min_stats = self._weighted_stats(facets['min_salaries'])
+            max_stats = self._weighted_stats(facets['max_salaries'])
+            summary['advanced_salary_stats'] = {
+                'mean_min_salary': int(min_stats['mean']),
+                'mean_max_salary': int(max_stats['mean']),
+                'median_min_salary': int(min_stats['median']),
+                'median_max_salary': int(max_stats['median']),
+                'std_min_salary': int(min_stats['std']),
+                'std_max_salary': int(max_stats['std'])
+            }
+            
+        # Analiza czasu pracy
+        if facets['work_times']:
+            summary['work_time_analysis'] = to_dict(facets['work_times'])
+            
+        # Trendy w branżach
+        if facets['industry_by_date']:
+            day_totals = {}
+            for row in facets['industry_by_date']:
+                day = row['_id']['day']
+                day_totals[day] = day_totals.get(day, 0) + row['count']
+            last_day = max(day_totals)
+            last_day_counts = sorted(
+                (row for row in facets['industry_by_date'] if row['_id']['day'] == last_day),
+                key=lambda row: row['count'], reverse=True
+            )
+            summary['industry_trends'] = {
+                'most_active_day': max(day_totals, key=day_totals.get).strftime('%Y-%m-%d'),
+                'top_growing_industries': [row['_id']['industry'] for row in last_day_counts[:5]]
+            }
+            
+        # Analiza lokalizacji
+        if facets['locations']:
+            location_stats = pd.Series(to_dict(facets['locations']))
+            summary['location_analysis'] = self._location_analysis(location_stats)
+            
+        return summary
+        
+    def _get_jobs_summary_stats(self):
+        """Buduje podsumowanie ofert z liczników w kolekcji job_stats"""
+        stats = {}
+        for doc in self.job_stats.find({'count': {'$gt': 0}}):
+            stats.setdefault(doc['_id']['dim'], []).append(doc)
+            
+        def to_dict(dim, limit=None):
+            rows = sorted(stats.get(dim, []), key=lambda doc: doc['count'], reverse=True)
+            return {doc['_id']['value']: doc['count'] for doc in rows[:limit]}
+            
+        total = stats.get('total', [])
+        unique = stats.get('unique', [])
+        
+        # Podstawowe statystyki
+        summary = {
+            'total_jobs': total[0]['count'] if total else 0,
+            'unique_jobs': unique[0]['count'] if unique else 0,
+            'contract_types': to_dict('contract_type'),
+            'jobs_by_location': to_dict('location', 10),
+            'work_modes': to_dict('work_mode'),
+            'industries': to_dict('industry'),
+            'position_levels': to_dict('position_level'),
+            'benefits_distribution': to_dict('benefits'),
+            'salary_stats': to_dict('salary'),
+        }
+        
+        # Statystyki wynagrodzeń - średnia i odchylenie z sum, mediana z liczności kwot
+        totals = {doc['_id']['value']: doc for doc in stats.get('salary_totals', [])}
+        if 'min' in totals and 'max' in totals:
+            salary_stats = {}
+            for bound in ('min', 'max'):
+                n, total_sum, total_sum_sq = totals[bound]['count'], totals[bound]['sum'], totals[bound]['sum_sq']
+                variance = (total_sum_sq - total_sum * total_sum / n) / (n - 1) if n > 1 else 0.0
+                salary_stats[f'mean_{bound}_salary'] = int(total_sum / n)
+                buckets = [{'_id': doc['_id']['value'], 'count': doc['count']} for doc in stats[f'salary_{bound}']]
+                salary_stats[f'median_{bound}_salary'] = int(self._weighted_stats(buckets)['median'])
+                salary_stats[f'std_{bound}_salary'] = int(np.sqrt(max(variance, 0.0)))
+            summary['advanced_salary_stats'] = {key: salary_stats[key] for key in (
+                'mean_min_salary', 'mean_max_salary', 'median_min_salary',
+                'median_max_salary', 'std_min_salary', 'std_max_salary'
+            )}
+            
+        # Analiza czasu pracy
+        if stats.get('work_time'):
+            summary['work_time_analysis'] = to_dict('work_time')
+            
+        # Trendy w branżach
+        if stats.get('industry_day'):
+            day_totals = {}
+            for doc in stats['industry_day']:
+                day = doc['_id']['value'][1]
+                day_totals[day] = day_totals.get(day, 0) + doc['count']
+            last_day = max(day_totals)
+            last_day_counts = sorted(
+                (doc for doc in stats['industry_day'] if doc['_id']['value'][1] == last_day),
+                key=lambda doc: doc['count'], reverse=True
+            )
+            summary['industry_trends'] = {
+                'most_active_day': max(day_totals, key=day_totals.get),
+                'top_growing_industries': [doc['_id']['value'][0] for doc in last_day_counts[:5]]
+            }
+            
+        # Analiza lokalizacji
+        if stats.get('location'):
+            summary['location_analysis'] = self._location_analysis(pd.Series(to_dict('location')))
+            
+        return summary
+        
+    @staticmethod
+    def _weighted_stats(buckets):
+        """Liczy średnią, medianę i odchylenie standardowe (próbkowe) z liczności wartości"""
+        values = np.array([bucket['_id'] for bucket in buckets], dtype=float)
+        counts = np.array([bucket['count'] for bucket in buckets], dtype=float)
+        order = np.argsort(values)
+        values, counts = values[order], counts[order]
+        n = counts.sum()
+        mean = (values * counts).sum() / n
+        std = np.sqrt((counts * (values - mean) ** 2).sum() / (n - 1)) if n > 1 else 0.0
+        # Mediana jak w pandas - średnia dwóch środkowych wartości dla parzystej liczby ofert
+        cumulative = np.cumsum(counts)
+        lower = values[np.searchsorted(cumulative, (n + 1) // 2)]
+        upper = values[np.searchsorted(cumulative, n // 2 + 1)]
+        return {'mean': mean, 'median': (lower + upper) / 2, 'std': std}
+        
+    @staticmethod
+    def _location_analysis(location_stats):
+        """Liczy rozkład liczby ofert w lokalizacjach"""
+        return {
+            'unique_locations': len(location_stats),
+            'top_10_locations': location_stats.head(10).to_dict(),
+            'location_distribution': {
+                'top_25_percent': len(location_stats[location_stats >= location_stats.quantile(0.75)]),
+                'middle_50_percent': len(location_stats[location_stats.between(location_stats.quantile(0.25), location_stats.quantile(0.75), inclusive='both')]),
+                'bottom_25_percent': len(location_stats[location_stats <= location_stats.quantile(0.25)])
+            }
+        }
+        
+    def _get_jobs_summary_pandas(self):
+        """Liczy podsumowanie ofert w pandas na wszystkich ofertach pobranych z bazy"""
         jobs_data = list(self.jobs.find({}, {'_id': 0}))
         df = pd.DataFrame(jobs_data)
         
@@ -64,6 +870,7 @@ class DatabaseManager:
         # Podstawowe statystyki
         summary = {
             'total_jobs': total_jobs,
+            'unique_jobs': int(df['duplicate_of'].isna().sum()) if 'duplicate_of' in df else total_jobs,
             'contract_types': df['contract_type'].value_counts().to_dict(),
             'jobs_by_location': df['location'].value_counts().head(10).to_dict(),
             'work_modes': df['work_mode'].value_counts().to_dict(),
@@ -96,21 +903,14 @@ class DatabaseManager:
             industry_by_date = df.groupby(['industry', df['date_posted'].dt.date]).size().unstack()
             summary['industry_trends'] = {
                 'most_active_day': industry_by_date.sum().idxmax().strftime('%Y-%m-%d'),
-                'top_growing_industries': industry_by_date.iloc[:, -1].nlargest(5).index.tolist()
+                # Branże bez ofert z ostatniego dnia mają NaN, a nlargest dopełnia nimi wynik do 5 pozycji
+                'top_growing_industries': industry_by_date.iloc[:, -1].dropna().nlargest(5).index.tolist()
             }
         
         # Analiza lokalizacji
         if 'location' in df.columns:
             location_stats = df['location'].value_counts()
-            summary['location_analysis'] = {
-                'unique_locations': len(location_stats),
-                'top_10_locations': location_stats.head(10).to_dict(),
-                'location_distribution': {
-                    'top_25_percent': len(location_stats[location_stats >= location_stats.quantile(0.75)]),
-                    'middle_50_percent': len(location_stats[location_stats.between(location_stats.quantile(0.25), location_stats.quantile(0.75), inclusive='both')]),
-                    'bottom_25_percent': len(location_stats[location_stats <= location_stats.quantile(0.25)])
-                }
-            }
+            summary['location_analysis'] = self._location_analysis(location_stats)
         
         return summary
         
@@ -0,0 +1,121 @@
+import hashlib
+import re
+import zlib
+
+import numpy as np
+
+# Liczba funkcji haszujących MinHash i podział sygnatury na pasma LSH (16 pasm po 8 wartości).
+# Oferty trafiają do wspólnego pasma z prawdopodobieństwem 1 - (1 - s^8)^16, gdzie s to
+# podobieństwo Jaccarda opisów: ~0.99 dla s=0.8, ~0.23 dla s=0.6, ~0.01 dla s=0.4
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+# Liczba słów w shinglu i minimalne (szacowane) podobieństwo opisów duplikatów
+SHINGLE_SIZE = 3
+THRESHOLD = 0.8
+# Liczba shingli haszowanych naraz - macierz NUM_PERM x MINHASH_CHUNK zajmuje 4 MB
+MINHASH_CHUNK = 4096
+
+# Liczba pierwsza większa od 2^32 - dla 32-bitowych a, x, b wartość a * x + b mieści się w uint64
+PRIME = np.uint64(4294967311)
+# Parametry funkcji haszujących muszą być stałe - sygnatury zapisujemy w bazie
+_rng = np.random.RandomState(20240601)
+PERM_A = _rng.randint(1, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+PERM_B = _rng.randint(0, 2 ** 32, size=NUM_PERM, dtype=np.uint64)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+def shingles(text):
+    """Zwraca hashe (crc32) unikalnych shingli - ciągów SHINGLE_SIZE kolejnych słów opisu"""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        words = words and [' '.join(words)]
+        size = 1
+    else:
+        size = SHINGLE_SIZE
+    grams = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(gram.encode('utf-8')) for gram in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash_signatures(texts):
+    """Liczy sygnatury MinHash wielu opisów naraz (None dla pustego opisu)
+
+    Shingle wszystkich opisów haszujemy operacjami na macierzach (NUM_PERM x MINHASH_CHUNK
+    shingli), a minimum dla każdego opisu wybieramy przez np.minimum.reduceat - pamięć
+    zależy od MINHASH_CHUNK, a nie od liczby opisów w paczce.
+    """
+    hashed = [shingles(text) if text else np.empty(0, dtype=np.uint64) for text in texts]
+    sizes = np.array([len(values) for values in hashed])
+    signatures = [None] * len(texts)
+    if not sizes.sum():
+        return signatures
+    non_empty = np.flatnonzero(sizes)
+    values = np.concatenate([hashed[i] for i in non_empty])
+    # Numer opisu (kolumny minima) dla każdego shingla - opis może zaczynać się w jednym
+    # fragmencie, a kończyć w kolejnym, więc minima fragmentów łączymy z poprzednimi
+    owners = np.repeat(np.arange(len(non_empty)), sizes[non_empty])
+    minima = np.full((NUM_PERM, len(non_empty)), np.iinfo(np.uint64).max, dtype=np.uint64)
+    for start in range(0, len(values), MINHASH_CHUNK):
+        chunk = values[start:start + MINHASH_CHUNK]
+        chunk_owners = owners[start:start + MINHASH_CHUNK]
+        permuted = (PERM_A[:, None] * chunk[None, :] + PERM_B[:, None]) % PRIME
+        offsets = np.flatnonzero(np.concatenate([[True], chunk_owners[1:] != chunk_owners[:-1]]))
+        columns = chunk_owners[offsets]
+        minima[:, columns] = np.minimum(minima[:, columns], np.minimum.reduceat(permuted, offsets, axis=1))
+    for column, i in enumerate(non_empty):
+        signatures[i] = minima[:, column]
+    return signatures
+
+
+def lsh_bands(signature):
+    """Zwraca klucze pasm LSH sygnatury - oferty z tym samym kluczem są kandydatami na duplikaty"""
+    return [
+        f"{band}:{hashlib.blake2b(signature[band * ROWS:(band + 1) * ROWS].tobytes(), digest_size=8).hexdigest()}"
+        for band in range(BANDS)
+    ]
+
+
+def similarity(signature, other):
+    """Szacuje podobieństwo Jaccarda opisów z dwóch sygnatur"""
+    return float(np.mean(signature == other))
+
+
+def signature_to_bytes(signature):
+    """Zamienia sygnaturę na bajty do zapisu w bazie"""
+    return signature.astype('<u8').tobytes()
+
+
+def signature_from_bytes(data):
+    """Odtwarza sygnaturę zapisaną w bazie"""
+    return np.frombuffer(data, dtype='<u8').astype(np.uint64)
+
+
+class LSHIndex:
+    """Indeks LSH w pamięci - wyszukuje podobne sygnatury tylko wśród ofert ze wspólnym pasmem"""
+
+    def __init__(self, threshold=THRESHOLD):
+        self.threshold = threshold
+        self.buckets = {}
+        self.signatures = {}
+        self.clusters = {}
+        self.positions = {}
+
+    def add(self, key, signature, cluster=None, bands=None):
+        """Dodaje ofertę (np. URL) do indeksu; cluster to pierwsza oferta grupy duplikatów"""
+        self.signatures[key] = signature
+        self.clusters[key] = key if cluster is None else cluster
+        self.positions.setdefault(key, len(self.positions))
+        for band in bands or lsh_bands(signature):
+            self.buckets.setdefault(band, []).append(key)
+
+    def query(self, signature, bands=None):
+        """Zwraca grupę duplikatów najbardziej podobnej oferty (podobieństwo >= threshold) lub None"""
+        candidates = {key for band in bands or lsh_bands(signature) for key in self.buckets.get(band, ())}
+        best, best_similarity = None, self.threshold
+        # Przy równym podobieństwie wygrywa oferta dodana wcześniej - wynik nie zależy od kolejności w zbiorze
+        for key in sorted(candidates, key=self.positions.get):
+            score = similarity(signature, self.signatures[key])
+            if score > best_similarity or (best is None and score >= best_similarity):
+                best, best_similarity = key, score
+        return self.clusters[best] if best is not None else None
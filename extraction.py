@@ -0,0 +1,84 @@
+import re
+from functools import lru_cache
+
+import pandas as pd
+
+# Wzorce pól wyciąganych z opisu oferty - kompilowane raz, przy imporcie modułu
+SALARY_PATTERN = re.compile(
+    r'Kwota od (?P<salary_min>\d+)\s*(?:tysięcy|tys\.?)\s*do\s*(?P<salary_max>\d+)\s*(?:tysięcy|tys\.?)'
+)
+HOURS_PATTERN = re.compile(r'(?:Około|Ok\.|około)\s*(?P<monthly_hours>\d+)\s*h(?:odzin)?\s*(?:w|na)\s*miesiąc')
+SCHEDULE_PATTERN = re.compile(r'(?:Zjazdy|System|Praca)\s*(?P<work_schedule>\d+/\d+)(?:\s*(?:tygodnie|dni))?')
+
+# Mapowanie nazw pól z panelu oglDetails na pola oferty (w kolejności sprawdzania)
+DETAIL_FIELDS = {
+    'branża': 'industry',
+    'kategoria': 'industry',
+    'poziom stanowiska': 'position_level',
+    'wymiar pracy': 'work_time',
+    'rodzaj umowy': 'contract_type',
+    'charakter pracy': 'work_mode',
+}
+
+# Pola wyciągane z opisu oferty
+EXTRACTED_FIELDS = ['salary_range', 'monthly_hours', 'work_schedule']
+
+
+@lru_cache(maxsize=256)
+def map_detail_field(field_name):
+    """Zwraca pole oferty odpowiadające nazwie pola z panelu oglDetails lub None"""
+    key = DETAIL_FIELDS.get(field_name)
+    if key:
+        return key
+    # Nazwy pól na stronie bywają dłuższe (np. "Branża:") - szukamy po fragmencie nazwy
+    for name, key in DETAIL_FIELDS.items():
+        if name in field_name:
+            return key
+    return None
+
+
+def salary_range(salary_min, salary_max):
+    """Buduje zakres wynagrodzenia z kwot podanych w tysiącach"""
+    return {'min': int(salary_min) * 1000, 'max': int(salary_max) * 1000, 'currency': 'PLN'}
+
+
+def extract_fields(description):
+    """Wyciąga zakres wynagrodzenia, liczbę godzin i harmonogram pracy z opisu jednej oferty"""
+    fields = {}
+
+    salary_match = SALARY_PATTERN.search(description)
+    if salary_match:
+        fields['salary_range'] = salary_range(salary_match.group('salary_min'), salary_match.group('salary_max'))
+
+    hours_match = HOURS_PATTERN.search(description)
+    if hours_match:
+        fields['monthly_hours'] = int(hours_match.group('monthly_hours'))
+
+    schedule_match = SCHEDULE_PATTERN.search(description)
+    if schedule_match:
+        fields['work_schedule'] = schedule_match.group('work_schedule')
+
+    return fields
+
+
+def extract_fields_batch(descriptions):
+    """Wyciąga pola z wielu opisów naraz (Series.str.extract) - zwraca DataFrame z kolumnami EXTRACTED_FIELDS"""
+    descriptions = pd.Series(descriptions, dtype=object).fillna('')
+
+    salary = descriptions.str.extract(SALARY_PATTERN)
+    hours = descriptions.str.extract(HOURS_PATTERN)['monthly_hours']
+    schedule = descriptions.str.extract(SCHEDULE_PATTERN)['work_schedule']
+
+    # Wartości zamieniamy na typy Pythona, żeby dało się je zapisać w MongoDB
+    salary_ranges = [
+        salary_range(low, high) if isinstance(low, str) else None
+        for low, high in zip(salary['salary_min'], salary['salary_max'])
+    ]
+    monthly_hours = [int(value) if isinstance(value, str) else None for value in hours]
+    work_schedules = [value if isinstance(value, str) else None for value in schedule]
+
+    return pd.DataFrame({
+        'salary_range': salary_ranges,
+        'monthly_hours': monthly_hours,
+        'work_schedule': work_schedules,
+    }, index=descriptions.index, dtype=object)
@@ -0,0 +1,198 @@
+import json
+import sqlite3
+import threading
+import time
+import zlib
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Nagłówki, których nie zapisujemy - treść w cache jest już rozpakowana
+SKIPPED_HEADERS = {'content-encoding', 'transfer-encoding', 'content-length', 'connection'}
+# Co tyle zapisów usuwamy przeterminowane odpowiedzi i zapisujemy czasy użycia odpowiedzi z cache
+MAINTENANCE_EVERY = 100
+
+
+class CacheMissError(requests.ConnectionError):
+    """Brak odpowiedzi w cache w trybie offline"""
+
+
+class ResponseCache:
+    """Trwały cache odpowiedzi HTTP w SQLite z kompresją, wygasaniem (TTL) i limitem rozmiaru (LRU)"""
+
+    def __init__(self, path='http_cache.sqlite', ttl=3600, max_age=7 * 24 * 3600, max_size=512 * 1024 * 1024):
+        # ttl - czas, przez który odpowiedź jest świeża i nie pytamy serwera
+        # max_age - po tym czasie usuwamy odpowiedź z cache zamiast ją rewalidować
+        # max_size - limit rozmiaru skompresowanych treści, po przekroczeniu usuwamy najdawniej używane
+        self.ttl = ttl
+        self.max_age = max_age
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL - zapis odpowiedzi nie blokuje odczytów i jest tańszy
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                status INTEGER,
+                headers TEXT,
+                content BLOB,
+                size INTEGER,
+                stored_at REAL,
+                accessed_at REAL
+            )
+        ''')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)')
+        self.conn.execute('CREATE INDEX IF NOT EXISTS responses_stored_at ON responses (stored_at)')
+        self.conn.commit()
+        # Łączny rozmiar treści liczymy raz, a potem aktualizujemy przy zapisie i usuwaniu odpowiedzi
+        self.total_size = self.conn.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+        # Czasy użycia odpowiedzi z cache zapisujemy do bazy paczkami, a nie przy każdym odczycie
+        self.accessed = {}
+        self.writes = 0
+        self.evict()
+
+    def get(self, url):
+        """Zwraca zapisaną odpowiedź dla URL lub None"""
+        with self.lock:
+            row = self.conn.execute(
+                'SELECT status, headers, content, stored_at FROM responses WHERE url = ?', (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.accessed[url] = time.time()
+            if len(self.accessed) >= MAINTENANCE_EVERY:
+                self._flush_accessed()
+                self.conn.commit()
+        status, headers, content, stored_at = row
+        return {
+            'status': status,
+            'headers': CaseInsensitiveDict(json.loads(headers)),
+            'content': zlib.decompress(content),
+            'stored_at': stored_at,
+        }
+
+    def can_serve(self, url, offline=False):
+        """Sprawdza czy odpowiedź dla URL zostanie podana z cache bez zapytania do serwera"""
+        with self.lock:
+            row = self.conn.execute('SELECT stored_at FROM responses WHERE url = ?', (url,)).fetchone()
+        return row is not None and (offline or time.time() - row[0] < self.ttl)
+
+    def is_fresh(self, entry):
+        """Sprawdza czy odpowiedź z cache można użyć bez pytania serwera"""
+        return time.time() - entry['stored_at'] < self.ttl
+
+    def set(self, url, status, headers, content):
+        """Zapisuje odpowiedź w cache"""
+        headers = {k: v for k, v in headers.items() if k.lower() not in SKIPPED_HEADERS}
+        compressed = zlib.compress(content)
+        now = time.time()
+        with self.lock:
+            old = self.conn.execute('SELECT size FROM responses WHERE url = ?', (url,)).fetchone()
+            self.conn.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, status, json.dumps(headers), compressed, len(compressed), now, now)
+            )
+            self.conn.commit()
+            self.accessed.pop(url, None)
+            self.total_size += len(compressed) - (old[0] if old else 0)
+            self.writes += 1
+            maintenance = self.writes % MAINTENANCE_EVERY == 0
+        if maintenance or self.total_size > self.max_size:
+            self.evict()
+
+    def touch(self, url):
+        """Odnawia świeżość odpowiedzi po potwierdzeniu przez serwer (304 Not Modified)"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute('UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?', (now, now, url))
+            self.conn.commit()
+
+    def _flush_accessed(self):
+        """Zapisuje do bazy czasy użycia odpowiedzi odczytanych z cache (wywołanie pod self.lock)"""
+        if self.accessed:
+            self.conn.executemany('UPDATE responses SET accessed_at = ? WHERE url = ?',
+                                  [(accessed_at, url) for url, accessed_at in self.accessed.items()])
+            self.accessed = {}
+
+    def evict(self):
+        """Usuwa przeterminowane odpowiedzi i najdawniej używane, jeśli cache przekroczył limit rozmiaru"""
+        with self.lock:
+            self._flush_accessed()
+            expired_before = time.time() - self.max_age
+            expired = self.conn.execute(
+                'SELECT COALESCE(SUM(size), 0) FROM responses WHERE stored_at < ?', (expired_before,)
+            ).fetchone()[0]
+            if expired:
+                self.conn.execute('DELETE FROM responses WHERE stored_at < ?', (expired_before,))
+                self.total_size -= expired
+            if self.total_size > self.max_size:
+                to_delete = []
+                for url, size in self.conn.execute('SELECT url, size FROM responses ORDER BY accessed_at'):
+                    if self.total_size <= self.max_size:
+                        break
+                    to_delete.append((url,))
+                    self.total_size -= size
+                self.conn.executemany('DELETE FROM responses WHERE url = ?', to_delete)
+            self.conn.commit()
+
+    def close(self):
+        """Zapisuje czasy użycia odpowiedzi i zamyka połączenie z plikiem cache"""
+        with self.lock:
+            self._flush_accessed()
+            self.conn.commit()
+            self.conn.close()
+
+
+class CachingAdapter(HTTPAdapter):
+    """Adapter requests obsługujący zapytania GET z cache i rewalidujący je nagłówkami ETag/Last-Modified"""
+
+    def __init__(self, cache, offline=False, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+        # W trybie offline odpowiadamy wyłącznie z cache, bez żadnych zapytań do sieci
+        self.offline = offline
+
+    def send(self, request, **kwargs):
+        if request.method != 'GET':
+            return super().send(request, **kwargs)
+
+        entry = self.cache.get(request.url)
+        if entry and (self.offline or self.cache.is_fresh(entry)):
+            return self.build_cached_response(request, entry)
+        if self.offline:
+            raise CacheMissError(f"Brak odpowiedzi w cache dla {request.url} (tryb offline)", request=request)
+
+        # Nieświeża odpowiedź w cache - pytamy serwer warunkowo, niezmieniona strona wraca jako 304
+        if entry:
+            etag = entry['headers'].get('ETag')
+            last_modified = entry['headers'].get('Last-Modified')
+            if etag:
+                request.headers['If-None-Match'] = etag
+            if last_modified:
+                request.headers['If-Modified-Since'] = last_modified
+
+        response = super().send(request, **kwargs)
+        if response.status_code == 304 and entry:
+            self.cache.touch(request.url)
+            return self.build_cached_response(request, entry)
+        if response.status_code == 200:
+            self.cache.set(request.url, response.status_code, response.headers, response.content)
+        return response
+
+    def build_cached_response(self, request, entry):
+        """Buduje obiekt Response z odpowiedzi zapisanej w cache"""
+        response = requests.Response()
+        response.status_code = entry['status']
+        response.reason = 'OK'
+        response.headers = CaseInsensitiveDict(entry['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = entry['content']
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.from_cache = True
+        return response
@@ -0,0 +1,125 @@
+import cProfile
+import json
+import pstats
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+from time import perf_counter
+
+import numpy as np
+
+# pyinstrument jest opcjonalny - bez niego dostępny jest tylko cProfile
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+
+class Metrics:
+    """Czasy etapów scrapowania (histogramy) i liczniki zdarzeń, bezpieczne dla wielu wątków"""
+
+    def __init__(self):
+        self.timings = defaultdict(list)
+        self.counters = defaultdict(int)
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def timer(self, name):
+        """Mierzy czas wykonania bloku i zapisuje go pod podaną nazwą etapu"""
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, perf_counter() - start)
+
+    def observe(self, name, seconds):
+        """Zapisuje zmierzony czas etapu"""
+        with self.lock:
+            self.timings[name].append(seconds)
+
+    def increment(self, name, amount=1):
+        """Zwiększa licznik zdarzeń"""
+        with self.lock:
+            self.counters[name] += amount
+
+    def reset(self):
+        """Czyści wszystkie pomiary"""
+        with self.lock:
+            self.timings.clear()
+            self.counters.clear()
+
+    def summary(self):
+        """Zwraca statystyki czasów etapów (w milisekundach) i wartości liczników"""
+        with self.lock:
+            timings = {name: np.array(values) * 1000 for name, values in self.timings.items() if values}
+            counters = dict(self.counters)
+        stages = {}
+        for name, values in sorted(timings.items()):
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            stages[name] = {
+                'count': len(values),
+                'total_ms': round(float(values.sum()), 2),
+                'mean_ms': round(float(values.mean()), 2),
+                'p50_ms': round(float(p50), 2),
+                'p95_ms': round(float(p95), 2),
+                'p99_ms': round(float(p99), 2),
+                'max_ms': round(float(values.max()), 2),
+            }
+        return {'stages': stages, 'counters': dict(sorted(counters.items()))}
+
+    def report(self):
+        """Wypisuje tabelę czasów etapów i liczników"""
+        summary = self.summary()
+        print("\nProfil uruchomienia:")
+        print("-" * 50)
+        print(f"{'etap':<34} {'liczba':>7} {'suma [s]':>9} {'p50 [ms]':>9} {'p95 [ms]':>9} {'p99 [ms]':>9}")
+        for name, stats in summary['stages'].items():
+            print(f"{name:<34} {stats['count']:>7} {stats['total_ms'] / 1000:>9.2f} "
+                  f"{stats['p50_ms']:>9.1f} {stats['p95_ms']:>9.1f} {stats['p99_ms']:>9.1f}")
+        if summary['counters']:
+            print("\nLiczniki:")
+            for name, value in summary['counters'].items():
+                print(f"- {name}: {value:,}")
+
+    def dump_json(self, filename):
+        """Dopisuje statystyki uruchomienia jako jedną linię JSON - do śledzenia trendów między uruchomieniami"""
+        record = {'timestamp': datetime.now().isoformat(timespec='seconds'), **self.summary()}
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        print(f"Zapisano profil uruchomienia do pliku {filename}")
+
+
+# Wspólny rejestr pomiarów dla scrapera i bazy danych
+metrics = Metrics()
+
+
+class Profiler:
+    """Profiler całego uruchomienia: cProfile (wbudowany, tylko wątek główny) lub pyinstrument"""
+
+    def __init__(self, kind='cprofile', output=None):
+        if kind == 'pyinstrument' and pyinstrument is None:
+            raise RuntimeError("Profilowanie pyinstrument wymaga pakietu pyinstrument")
+        self.kind = kind
+        self.output = output or ('profile.html' if kind == 'pyinstrument' else 'profile.prof')
+        self.profiler = pyinstrument.Profiler() if kind == 'pyinstrument' else cProfile.Profile()
+
+    def start(self):
+        """Rozpoczyna profilowanie"""
+        if self.kind == 'pyinstrument':
+            self.profiler.start()
+        else:
+            self.profiler.enable()
+
+    def stop(self):
+        """Kończy profilowanie, zapisuje wynik do pliku i wypisuje najdroższe funkcje"""
+        if self.kind == 'pyinstrument':
+            self.profiler.stop()
+            with open(self.output, 'w', encoding='utf-8') as f:
+                f.write(self.profiler.output_html())
+            print(self.profiler.output_text())
+        else:
+            self.profiler.disable()
+            self.profiler.dump_stats(self.output)
+            pstats.Stats(self.profiler).sort_stats('cumulative').print_stats(20)
+        print(f"Zapisano profil do pliku {self.output}")
@@ -1,14 +1,40 @@
 import requests
-from bs4 import BeautifulSoup
-from time import sleep
+from requests.adapters import HTTPAdapter
+from time import sleep, monotonic
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from collections import deque
 import pandas as pd
 from datetime import datetime
-import random
-import re
+import queue
+from parsers import DEFAULT_PARSER, parse_job_details_batch
+from http_cache import ResponseCache, CachingAdapter, CacheMissError
+from instrumentation import metrics
+from rate_limiter import AdaptiveRateLimiter, RetryPolicy, RETRY_STATUSES, parse_retry_after
+from sources import TrojmiastoSource
+
+
+def parse_pool(workers):
+    """Tworzy pulę procesów parsujących strony ofert
+
+    Procesy uruchamiamy przez forkserver (spawn tam, gdzie go nie ma), a nie fork - pulę
+    tworzymy, gdy działają już wątki pobierające, a fork kopiuje blokady zajęte przez
+    te wątki (np. logowania czy puli połączeń), co może zawiesić proces potomny.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+    return ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
 
 class JobScraper:
-    def __init__(self):
-        self.base_url = "https://ogloszenia.trojmiasto.pl/praca-zatrudnie/"
+    def __init__(self, concurrency=1, parser=None, cache_path=None, cache_ttl=3600, offline=False,
+                 rate=4.0, max_retries=3, timeout=30, rate_limiter=None, parse_workers=0, parse_batch=16, base_url=None,
+                 crawl_state=None, source=None, process_pool=None, cache=None):
+        # Źródło ofert (adresy list ofert i parsery stron) - domyślnie ogloszenia.trojmiasto.pl;
+        # base_url pozwala podmienić adres listy ofert, np. na lokalny serwer w benchmarkach
+        self.source = source or TrojmiastoSource(base_url)
+        self.base_url = self.source.base_url
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8',
@@ -17,220 +43,407 @@ class JobScraper:
         self.jobs = []
         self.session = requests.Session()
         self.session.headers.update(self.headers)
+        # Liczba równoległych pobrań stron ofert (1 = tryb sekwencyjny)
+        self.concurrency = max(1, concurrency)
+        # Pula połączeń musi pomieścić wszystkie wątki korzystające ze wspólnej sesji
+        pool_size = {'pool_connections': self.concurrency, 'pool_maxsize': self.concurrency}
+        if cache or cache_path:
+            # Odpowiedzi zapisujemy na dysku - ponowne uruchomienia rewalidują strony
+            # warunkowo (304) albo, w trybie offline, działają bez dostępu do sieci.
+            # Gotowy cache (cache) może być wspólny dla scraperów wielu źródeł
+            self.cache = cache or ResponseCache(cache_path, ttl=cache_ttl)
+            adapter = CachingAdapter(self.cache, offline=offline, **pool_size)
+        elif offline:
+            raise ValueError("Tryb offline wymaga podania pliku cache (cache_path)")
+        else:
+            self.cache = None
+            adapter = HTTPAdapter(**pool_size)
+        self.offline = offline
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # Parser HTML dla BeautifulSoup (domyślnie lxml, jeśli jest zainstalowany)
+        self.parser = parser or DEFAULT_PARSER
+        # Liczba procesów parsujących strony ofert (0 = parsowanie w wątkach pobierających)
+        # i liczba stron przekazywanych do procesu w jednej paczce
+        self.parse_workers = max(0, parse_workers)
+        self.parse_batch = max(1, parse_batch)
+        # Wspólna pula procesów parsujących (np. z MultiSourceScraper) - nie zamykamy jej po scrapowaniu
+        self.process_pool = process_pool
+        self.run_stats = {'scraped': 0, 'skipped': 0, 'errors': 0}
+        # Wspólny dla wszystkich wątków limit zapytań na host, dostosowywany do odpowiedzi serwera
+        self.rate_limiter = rate_limiter or AdaptiveRateLimiter(rate=rate)
+        self.retry_policy = RetryPolicy(max_retries=max_retries)
+        self.timeout = timeout
+        # Liczniki ponowień i nieudanych pobrań z bieżącego scrapowania
+        self.stats = {'retries': 0, 'failed_pages': [], 'failed_offers': []}
+        self.stats_lock = threading.Lock()
+        # Stan scrapowania (CrawlState) - pozwala wznowić przerwane scrapowanie
+        self.crawl_state = crawl_state
+
+    def fetch(self, url, stage='fetch'):
+        """Pobiera stronę w ramach limitu zapytań, ponawiając ją przy błędach przejściowych (429, 5xx, sieć)
+
+        Czas samego zapytania zapisujemy w pomiarach jako "<stage>.network",
+        a czas oczekiwania na limit zapytań - osobno, jako "rate_limit_wait".
+        Odpowiedzi podawane z cache bez pytania serwera nie zużywają limitu zapytań.
+        """
+        cached = self.cache is not None and self.cache.can_serve(url, self.offline)
+        for attempt in range(self.retry_policy.max_retries + 1):
+            if not cached:
+                with metrics.timer('rate_limit_wait'):
+                    self.rate_limiter.acquire(url)
+            start = monotonic()
+            retry_after = None
+            try:
+                with metrics.timer(f'{stage}.network'):
+                    response = self.session.get(url, timeout=self.timeout)
+                # Liczniki http.requests i http.bytes_downloaded obejmują tylko ruch sieciowy -
+                # treści z cache (także po rewalidacji 304) liczymy osobno
+                if not cached:
+                    metrics.increment('http.requests')
+                if getattr(response, 'from_cache', False):
+                    metrics.increment('http.cache_hits')
+                    metrics.increment('http.cache_bytes', len(response.content))
+                else:
+                    metrics.increment('http.bytes_downloaded', len(response.content))
+            except CacheMissError:
+                # Brak strony w cache w trybie offline - ponawianie nic nie da
+                raise
+            except requests.RequestException as e:
+                error = e
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    # Pozostałe błędy (np. 404) nie są przejściowe - nie ponawiamy
+                    response.raise_for_status()
+                    # Tempo dostosowujemy tylko do odpowiedzi serwera, a nie do odpowiedzi z cache
+                    if not cached:
+                        self.rate_limiter.record_success(url, monotonic() - start)
+                    return response
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                error = requests.HTTPError(f"{response.status_code} dla {url}", response=response)
+                
+            self.rate_limiter.record_error(url, retry_after)
+            metrics.increment('http.errors')
+            if attempt == self.retry_policy.max_retries:
+                raise error
+            with self.stats_lock:
+                self.stats['retries'] += 1
+            metrics.increment('http.retries')
+            sleep(self.retry_policy.delay(attempt, retry_after))
+
+    def report_stats(self):
+        """Wypisuje podsumowanie limitów zapytań, ponowień i nieudanych pobrań"""
+        print(f"Ponowienia zapytań: {self.stats['retries']}")
+        for host, stats in self.rate_limiter.report().items():
+            print(f"- {host}: {stats['rate']} zapytań/s, zapytania: {stats['requests']}, "
+                  f"błędy: {stats['errors']}, Retry-After: {stats['retry_after']}")
+        if self.stats['failed_pages']:
+            print(f"Nieudane strony z listą ofert: {', '.join(map(str, self.stats['failed_pages']))}")
+        if self.stats['failed_offers']:
+            print(f"Nieudane oferty ({len(self.stats['failed_offers'])}):")
+            for url in self.stats['failed_offers']:
+                print(f"- {url}")
 
     def get_page(self, page=1):
         """Pobiera pojedynczą stronę z listą ofert pracy"""
         try:
-            if page > 1:
-                url = f"{self.base_url}?strona={page}"
-            else:
-                url = self.base_url
-                
-            print(f"Pobieram stronę {page}")
-            response = self.session.get(url)
-            response.raise_for_status()
-            return BeautifulSoup(response.text, 'html.parser')
+            url = self.source.listing_url(page)
+            print(f"Pobieram stronę {page} ({self.source.name})")
+            response = self.fetch(url, stage='get_page')
+            with metrics.timer('get_page.parse'):
+                return self.source.parse_listing_page(response.content, self.parser)
         except Exception as e:
             print(f"Błąd podczas pobierania strony {page}: {e}")
+            metrics.increment('errors.page')
+            with self.stats_lock:
+                self.stats['failed_pages'].append(page)
             return None
 
+    def parse_listing_item(self, job_item):
+        """Parsuje podstawowe informacje o ofercie widoczne na liście ofert"""
+        return self.source.parse_listing_item(job_item)
+
+    def is_known_offer(self, listing, known_offers):
+        """Sprawdza czy oferta z listy jest już zapisana i nie zmieniła się od ostatniego scrapowania"""
+        dates = known_offers.get(listing['url'])
+        if dates is None:
+            dates = known_offers.get(listing['offer_id'])
+        if dates is None:
+            return False
+        # Bez daty na liście ofert nie wykryjemy zmiany - traktujemy ofertę jako znaną
+        return listing['date_posted'] is None or listing['date_posted'] in dates
+
+    def build_job(self, listing, job_details):
+        """Łączy informacje z listy ofert ze szczegółami ze strony oferty"""
+        return {
+            'title': listing['title'],
+            'location': listing['location'] or job_details.get('location'),
+            'url': listing['url'],
+            'offer_id': job_details.get('offer_id') or listing['offer_id'],
+            'salary': listing['salary'] or job_details.get('salary'),
+            'date_posted': listing['date_posted'] or job_details.get('date_posted'),
+            'date_updated': job_details.get('date_updated'),
+            'work_mode': job_details.get('work_mode'),
+            'contract_type': job_details.get('contract_type'),
+            'work_time': job_details.get('work_time'),
+            'industry': job_details.get('industry'),
+            'position_level': job_details.get('position_level'),
+            'description': job_details.get('description'),
+            'salary_range': job_details.get('salary_range'),
+            'monthly_hours': job_details.get('monthly_hours'),
+            'work_schedule': job_details.get('work_schedule'),
+            'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'source': self.source.name,
+        }
+
     def parse_job_listing(self, job_item):
         """Parsuje pojedynczą ofertę pracy"""
         try:
-            # Znajdujemy tytuł i URL oferty
-            title_element = job_item.find('h2')
-            if not title_element:
-                return None
-                
-            title = title_element.get_text(strip=True)
-            url = title_element.find('a')['href'] if title_element.find('a') else None
-            if not url:
+            listing = self.parse_listing_item(job_item)
+            if not listing:
                 return None
-            if not url.startswith('http'):
-                url = 'https://ogloszenia.trojmiasto.pl' + url
-
-            # Pobieramy podstawowe informacje o ofercie
-            location = None
-            location_div = job_item.find('div', class_='list__location')
-            if location_div:
-                location = location_div.get_text(strip=True)
-
-            # Pobieramy wynagrodzenie jeśli dostępne
-            salary = None
-            salary_div = job_item.find('div', class_='list__salary')
-            if salary_div:
-                salary = salary_div.get_text(strip=True)
-
-            # Pobieramy datę dodania oferty
-            date_posted = None
-            date_div = job_item.find('div', class_='list__date')
-            if date_div:
-                date_posted = date_div.get_text(strip=True)
 
             # Pobieramy szczegóły oferty ze strony oferty
-            job_details = self.get_job_description(url) if url else {}
+            job_details = self.get_job_description(listing['url'])
+            if not job_details:
+                return None
 
             # Łączymy wszystkie informacje
-            job_data = {
-                'title': title,
-                'location': location or job_details.get('location'),
-                'url': url,
-                'salary': salary or job_details.get('salary'),
-                'date_posted': date_posted or job_details.get('date_posted'),
-                'date_updated': job_details.get('date_updated'),
-                'work_mode': job_details.get('work_mode'),
-                'contract_type': job_details.get('contract_type'),
-                'work_time': job_details.get('work_time'),
-                'industry': job_details.get('industry'),
-                'position_level': job_details.get('position_level'),
-                'description': job_details.get('description'),
-                'scraped_date': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            }
-
-            return job_data
+            return self.build_job(listing, job_details)
 
         except Exception as e:
             print(f"Błąd podczas parsowania oferty: {e}")
             return None
 
+    def fetch_job_page(self, url):
+        """Pobiera surowy HTML strony oferty (None w przypadku błędu)"""
+        try:
+            return self.fetch(url, stage='get_job_description').content
+        except Exception as e:
+            print(f"Błąd podczas pobierania opisu oferty: {e}")
+            metrics.increment('errors.offer')
+            with self.stats_lock:
+                self.stats['failed_offers'].append(url)
+            return None
+
     def get_job_description(self, url):
         """Pobiera pełny opis oferty ze strony oferty"""
+        content = self.fetch_job_page(url)
+        if content is None:
+            return {}
         try:
-            sleep(random.uniform(0, 0.5))  # Zmniejszony czas oczekiwania
-            response = self.session.get(url)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            job_details = {}
-            
-            # Znajdujemy główną treść opisu oferty
-            content = soup.find('div', class_='ogl__description')
-            if content:
-                description_text = content.get_text(strip=True)
-                job_details['description'] = description_text
-                
-                # Wyciągamy zakres wynagrodzenia z opisu
-                salary_match = re.search(r'Kwota od (\d+)\s*(?:tysięcy|tys\.?)\s*do\s*(\d+)\s*(?:tysięcy|tys\.?)', description_text)
-                if salary_match:
-                    job_details['salary_range'] = {
-                        'min': int(salary_match.group(1)) * 1000,
-                        'max': int(salary_match.group(2)) * 1000,
-                        'currency': 'PLN'
-                    }
-                
-                # Wyciągamy godziny pracy
-                hours_match = re.search(r'(?:Około|Ok\.|około)\s*(\d+)\s*h(?:odzin)?\s*(?:w|na)\s*miesiąc', description_text)
-                if hours_match:
-                    job_details['monthly_hours'] = int(hours_match.group(1))
+            with metrics.timer('get_job_description.parse'):
+                return self.source.parse_job_details(content, self.parser)
+        except Exception as e:
+            print(f"Błąd podczas parsowania opisu oferty: {e}")
+            metrics.increment('errors.offer')
+            with self.stats_lock:
+                self.stats['failed_offers'].append(url)
+            return {}
+
+    def iter_listings(self, executor, num_pages=5, max_jobs=10, known_offers=None):
+        """Generator zwracający kolejne oferty z list ofert (bez szczegółów) - następna strona pobiera się w tle
+
+        Przy zapisanym stanie scrapowania najpierw zwracamy oferty przerwane i nieudane
+        w poprzednim uruchomieniu, a ukończone strony z listą ofert pomijamy.
+        """
+        pages = deque(range(1, num_pages + 1))
+        requeued = []
+        seen_urls = set()
+        if self.crawl_state:
+            requeued = self.crawl_state.requeue(self.source.name)
+            completed_pages = self.crawl_state.completed_pages(self.source.name)
+            pages = deque(page for page in pages if page not in completed_pages)
+            # Oferty z częściowo przetworzonych stron są już w stanie - nie dodajemy ich drugi raz
+            seen_urls = self.crawl_state.known_urls()
+        next_page = (pages[0], executor.submit(self.get_page, pages.popleft())) if pages else None
+        queued_jobs = 0
+        
+        try:
+            for listing in requeued:
+                if queued_jobs >= max_jobs:
+                    return
+                queued_jobs += 1
+                self.crawl_state.add_pending(listing, self.source.name)
+                yield listing
                 
-                # Wyciągamy harmonogram pracy
-                schedule_match = re.search(r'(?:Zjazdy|System|Praca)\s*(\d+/\d+)(?:\s*(?:tygodnie|dni))?', description_text)
-                if schedule_match:
-                    job_details['work_schedule'] = schedule_match.group(1)
-            
-            # Wyciągamy dodatkowe szczegóły z panelu oglDetails
-            details_panel = soup.find('div', class_='oglDetails')
-            if details_panel:
-                # Znajdujemy wszystkie kontenery pól
-                fields = details_panel.find_all('div', class_='oglField')
-                for field in fields:
-                    # Pobieramy nazwę i wartość pola
-                    name_div = field.find('div', class_='oglField__name')
-                    value_divs = field.find_all('div', class_='oglField__value')
+            while next_page and queued_jobs < max_jobs:
+                page, page_future = next_page
+                next_page = (pages[0], executor.submit(self.get_page, pages.popleft())) if pages else None
+                try:
+                    job_listings = page_future.result()
+                    if job_listings is None:
+                        print(f"\nPomijam stronę {page} z powodu błędu")
+                        if self.crawl_state:
+                            self.crawl_state.set_page(self.source.name, page, 'failed')
+                        continue
+                        
+                    print(f"\nZnaleziono {len(job_listings)} ofert na stronie {page}")
+                    
+                    page_known = 0
+                    page_complete = True
+                    for job_item in job_listings:
+                        # Limit max_jobs stosujemy przed pobraniem szczegółów,
+                        # żeby nie pobierać zbędnych stron ofert
+                        if queued_jobs >= max_jobs:
+                            page_complete = False
+                            break
+                        try:
+                            with metrics.timer('parse_job_listing'):
+                                listing = self.parse_listing_item(job_item)
+                        except Exception as e:
+                            self.run_stats['errors'] += 1
+                            print(f"\nBłąd podczas parsowania oferty: {e}")
+                            continue
+                        if not listing:
+                            continue
+                        if known_offers is not None and self.is_known_offer(listing, known_offers):
+                            page_known += 1
+                            continue
+                        if listing['url'] in seen_urls:
+                            continue
+                        queued_jobs += 1
+                        if self.crawl_state:
+                            self.crawl_state.add_pending(listing, self.source.name)
+                        yield listing
+                    self.run_stats['skipped'] += page_known
+                    if self.crawl_state and page_complete:
+                        self.crawl_state.set_page(self.source.name, page, 'done')
                     
-                    if name_div:
-                        field_name = name_div.get_text(strip=True).lower()
-                        field_values = [v.get_text(strip=True) for v in value_divs]
-                        field_value = ', '.join(field_values) if field_values else None
+                    # Cała strona znanych ofert - starsze strony też już mamy w bazie
+                    if job_listings and page_known == len(job_listings):
+                        print(f"\nStrona {page} zawiera wyłącznie znane oferty - kończę pobieranie stron")
+                        if next_page:
+                            next_page[1].cancel()
+                        next_page = None
                         
-                        # Mapujemy nazwy pól do naszej struktury
-                        if 'branża' in field_name or 'kategoria' in field_name:
-                            job_details['industry'] = field_value
-                        elif 'poziom stanowiska' in field_name:
-                            job_details['position_level'] = field_value
-                        elif 'wymiar pracy' in field_name:
-                            job_details['work_time'] = field_value
-                        elif 'rodzaj umowy' in field_name:
-                            job_details['contract_type'] = field_value
-                        elif 'charakter pracy' in field_name:
-                            job_details['work_mode'] = field_value
-            
-            # Pobieramy informacje o lokalizacji z pełnym adresem
-            location_div = soup.find('span', class_='topBar__item--address')
-            if location_div:
-                location_text = location_div.get_text(strip=True)
-                # Dzielimy na miasto i ulicę
-                location_parts = location_text.split('\n')
-                if len(location_parts) > 1:
-                    job_details['city'] = location_parts[0].strip()
-                    job_details['street'] = location_parts[1].strip()
-                job_details['location'] = location_text
-            
-            # Pobieramy datę dodania, aktualizacji i ID oferty
-            stats_div = soup.find('div', class_='oglStats')
-            if stats_div:
-                date_elements = stats_div.find_all('p')
-                for date_el in date_elements:
-                    date_text = date_el.get_text(strip=True)
-                    if 'Data dodania' in date_text:
-                        job_details['date_posted'] = date_el.find('span').get_text(strip=True)
-                    elif 'Aktualizacja' in date_text:
-                        job_details['date_updated'] = date_el.find('span').get_text(strip=True)
-                    elif 'ID oferty' in date_text:
-                        job_details['offer_id'] = date_el.find('span').get_text(strip=True)
-            
-            return job_details
-            
-        except Exception as e:
-            print(f"Błąd podczas pobierania opisu oferty: {e}")
-            return {}
+                except Exception as e:
+                    self.run_stats['errors'] += 1
+                    print(f"\nBłąd podczas scrapowania strony {page}: {e}")
+        finally:
+            if next_page:
+                next_page[1].cancel()
 
-    def scrape_jobs(self, num_pages=5, max_jobs=10):
-        """Scrapuje określoną liczbę stron z ofertami"""
-        print(f"Rozpoczynam scrapowanie ofert z trojmiasto.pl (max {max_jobs} ofert)...")
+    def iter_jobs(self, num_pages=5, max_jobs=10, known_offers=None):
+        """Generator zwracający kolejne oferty zaraz po ich zescrapowaniu
+
+        Oferty nie są gromadzone w pamięci - konsument (np. DatabaseManager.save_jobs)
+        może zapisywać je na bieżąco.
+
+        known_offers (z DatabaseManager.get_known_offers) włącza tryb przyrostowy:
+        szczegóły pobieramy tylko dla nowych lub zaktualizowanych ofert, a scrapowanie
+        kończymy na pierwszej stronie zawierającej wyłącznie znane oferty.
+
+        Przy parse_workers > 0 wątki tylko pobierają HTML stron ofert, a parsowaniem
+        zajmują się procesy robocze, którym przekazujemy strony paczkami.
+        """
+        workers = f"{self.concurrency} wątków"
+        if self.parse_workers:
+            workers += f", {self.parse_workers} procesów parsujących"
+        print(f"Rozpoczynam scrapowanie ofert z {self.source.name} (max {max_jobs} ofert, {workers})...")
         
-        total_jobs_scraped = 0
-        errors = 0
+        self.run_stats = {'scraped': 0, 'skipped': 0, 'errors': 0}
+        own_pool = self.process_pool is None and self.parse_workers > 0
+        process_pool = parse_pool(self.parse_workers) if own_pool else self.process_pool
+        fetch_task = self.fetch_job_page if process_pool else self.get_job_description
         
-        for page in range(1, num_pages + 1):
-            if total_jobs_scraped >= max_jobs:
-                break
-                
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            listings = self.iter_listings(executor, num_pages, max_jobs, known_offers)
+            listings_done = False
+            # Kolejka pobieranych stron ofert w kolejności z listy ofert
+            pending = deque()
+            # Kolejka paczek stron parsowanych w procesach roboczych
+            parsing = deque()
+            
             try:
-                soup = self.get_page(page)
-                if not soup:
-                    print(f"\nPomijam stronę {page} z powodu błędu")
-                    continue
-                    
-                # Znajdujemy wszystkie oferty na stronie
-                job_listings = soup.find_all('div', class_='list__item')
-                print(f"\nZnaleziono {len(job_listings)} ofert na stronie {page}")
-                
-                for job_item in job_listings:
-                    if total_jobs_scraped >= max_jobs:
-                        break
+                while True:
+                    # Dopełniamy kolejkę ofertami z kolejnych stron, żeby wszystkie wątki miały pracę
+                    while not listings_done and len(pending) < 2 * self.concurrency:
+                        listing = next(listings, None)
+                        if listing is None:
+                            listings_done = True
+                            break
+                        pending.append((listing, executor.submit(fetch_task, listing['url'])))
                         
-                    try:
-                        job_data = self.parse_job_listing(job_item)
-                        if job_data:
-                            self.jobs.append(job_data)
-                            total_jobs_scraped += 1
-                            print(f"Postęp: {total_jobs_scraped}/{max_jobs} ofert zescrapowanych", end='\r')
-                    except Exception as e:
-                        errors += 1
-                        print(f"\nBłąd podczas parsowania oferty: {e}")
-                        continue
-                    
-                sleep(random.uniform(0, 0.5))  # Zmniejszony czas oczekiwania
-                
-            except Exception as e:
-                errors += 1
-                print(f"\nBłąd podczas scrapowania strony {page}: {e}")
-                continue
+                    # Wyniki odbieramy w kolejności z listy ofert, niezależnie od kolejności pobrania
+                    if process_pool:
+                        self._dispatch_parse_batches(pending, parsing, process_pool)
+                        if not parsing:
+                            break
+                        batch_listings, parse_future = parsing.popleft()
+                        try:
+                            batch_details, durations = parse_future.result()
+                        except Exception as e:
+                            print(f"\nBłąd podczas parsowania paczki ofert: {e}")
+                            for listing in batch_listings:
+                                self._record_failed_offer(listing['url'])
+                            continue
+                        # Czasy parsowania zmierzone w procesach roboczych dopisujemy do wspólnych pomiarów
+                        for seconds in durations:
+                            metrics.observe('get_job_description.parse', seconds)
+                        results = list(zip(batch_listings, batch_details))
+                    else:
+                        if not pending:
+                            break
+                        listing, future = pending.popleft()
+                        results = [(listing, future.result())]
+                        
+                    for listing, job_details in results:
+                        # Bez szczegółów nie zwracamy oferty - zapis nadpisałby zapisaną wersję pustymi
+                        # polami; oferta zostaje nieudana i wraca do kolejki przy wznowieniu scrapowania
+                        if not job_details:
+                            self._record_failed_offer(listing['url'])
+                            continue
+                        try:
+                            job_data = self.build_job(listing, job_details)
+                        except Exception as e:
+                            self.run_stats['errors'] += 1
+                            print(f"\nBłąd podczas parsowania oferty: {e}")
+                            continue
+                        self.run_stats['scraped'] += 1
+                        print(f"Postęp: {self.run_stats['scraped']}/{max_jobs} ofert zescrapowanych", end='\r')
+                        yield job_data
+            finally:
+                # Przerwanie generatora - nie czekamy na oferty, których nikt nie odbierze
+                for _, future in pending:
+                    future.cancel()
+                listings.close()
+                if own_pool:
+                    process_pool.shutdown(cancel_futures=True)
             
-        print(f"\nZescrapowano {total_jobs_scraped} ofert w sumie")
-        if errors > 0:
-            print(f"Napotkano {errors} błędów podczas scrapowania")
+        print(f"\nZescrapowano {self.run_stats['scraped']} ofert w sumie ({self.source.name})")
+        if self.run_stats['skipped'] > 0:
+            print(f"Pominięto {self.run_stats['skipped']} niezmienionych ofert zapisanych już w bazie")
+        if self.run_stats['errors'] > 0:
+            print(f"Napotkano {self.run_stats['errors']} błędów podczas scrapowania")
+        self.report_stats()
+
+    def _record_failed_offer(self, url):
+        """Zapisuje ofertę bez szczegółów jako nieudaną (w statystykach i w stanie scrapowania)"""
+        self.run_stats['errors'] += 1
+        with self.stats_lock:
+            # Nieudane pobranie fetch_job_page już zapisał
+            if url not in self.stats['failed_offers']:
+                self.stats['failed_offers'].append(url)
+        if self.crawl_state:
+            self.crawl_state.mark_failed(url)
+
+    def _dispatch_parse_batches(self, pending, parsing, process_pool):
+        """Przekazuje pobrane strony ofert do procesów parsujących paczkami po parse_batch stron"""
+        while pending and len(parsing) < 2 * self.parse_workers:
+            # Czekamy tylko na pierwszą stronę w kolejce, a do paczki dobieramy kolejne już pobrane
+            batch = [pending.popleft()]
+            while pending and len(batch) < self.parse_batch and pending[0][1].done():
+                batch.append(pending.popleft())
+            contents = [future.result() for _, future in batch]
+            parse_future = process_pool.submit(parse_job_details_batch, contents, self.parser,
+                                               self.source.parse_job_details)
+            parsing.append(([listing for listing, _ in batch], parse_future))
+
+    def scrape_jobs(self, num_pages=5, max_jobs=10, known_offers=None):
+        """Scrapuje określoną liczbę stron z ofertami"""
+        for job_data in self.iter_jobs(num_pages, max_jobs, known_offers):
+            self.jobs.append(job_data)
         return self.jobs
 
     def export_to_csv(self):
@@ -277,4 +490,106 @@ class JobScraper:
             'position_levels': df['position_level'].value_counts().to_dict(),
             'benefits_distribution': pd.DataFrame(df['benefits'].tolist()).stack().value_counts().to_dict()
         }
-        return summary 
\ No newline at end of file
+        return summary 
+
+# Znacznik końca ofert z jednego źródła we wspólnej kolejce MultiSourceScraper
+SOURCE_DONE = object()
+
+
+class MultiSourceScraper:
+    """Scrapuje kilka źródeł ofert równocześnie
+
+    Każde źródło ma własny JobScraper - osobne wątki pobierające i osobny limit zapytań,
+    więc wolne lub ograniczane źródło nie spowalnia pozostałych. Procesy parsujące, cache
+    odpowiedzi i zapis ofert (konsument iter_jobs) są wspólne dla wszystkich źródeł.
+    """
+
+    def __init__(self, sources, concurrency=1, rate=None, parse_workers=0, cache_path=None, cache_ttl=3600, **kwargs):
+        # concurrency - liczba wątków pobierających dla każdego źródła
+        # rate - początkowy limit zapytań na sekundę dla każdego źródła (domyślnie: JobSource.rate)
+        self.sources = sources
+        self.parse_workers = max(0, parse_workers)
+        self.cache = ResponseCache(cache_path, ttl=cache_ttl) if cache_path else None
+        self.scrapers = [
+            JobScraper(concurrency=concurrency, rate=rate or source.rate, parse_workers=self.parse_workers,
+                       source=source, cache=self.cache, **kwargs)
+            for source in sources
+        ]
+        self.jobs = []
+
+    def iter_jobs(self, num_pages=5, max_jobs=10, known_offers=None):
+        """Generator zwracający oferty ze wszystkich źródeł w kolejności ich zescrapowania
+
+        Każde źródło scrapujemy w osobnym wątku, który przekazuje oferty do wspólnej
+        kolejki. num_pages i max_jobs dotyczą każdego źródła osobno.
+        """
+        if len(self.scrapers) == 1:
+            yield from self.scrapers[0].iter_jobs(num_pages, max_jobs, known_offers)
+            return
+        
+        process_pool = parse_pool(self.parse_workers) if self.parse_workers else None
+        for scraper in self.scrapers:
+            scraper.process_pool = process_pool
+        # Ograniczona kolejka - przy wolnym zapisie scrapery czekają zamiast gromadzić oferty w pamięci
+        results = queue.Queue(maxsize=2 * sum(scraper.concurrency for scraper in self.scrapers))
+        stop = threading.Event()
+        
+        def crawl(scraper):
+            jobs = scraper.iter_jobs(num_pages, max_jobs, known_offers)
+            try:
+                for job_data in jobs:
+                    if not self._put(results, job_data, stop):
+                        break
+            except Exception as e:
+                print(f"\nBłąd podczas scrapowania źródła {scraper.source.name}: {e}")
+            finally:
+                jobs.close()
+                self._put(results, SOURCE_DONE, stop)
+        
+        threads = [threading.Thread(target=crawl, args=(scraper,), daemon=True) for scraper in self.scrapers]
+        for thread in threads:
+            thread.start()
+        try:
+            remaining = len(threads)
+            while remaining:
+                job_data = results.get()
+                if job_data is SOURCE_DONE:
+                    remaining -= 1
+                    continue
+                yield job_data
+        finally:
+            # Przerwanie generatora - scrapery kończą pracę przy następnej ofercie
+            stop.set()
+            for thread in threads:
+                thread.join()
+            if process_pool:
+                process_pool.shutdown(cancel_futures=True)
+            for scraper in self.scrapers:
+                scraper.process_pool = None
+        
+        self.report_stats()
+
+    @staticmethod
+    def _put(results, item, stop):
+        """Wstawia element do kolejki, chyba że konsument przerwał scrapowanie (zwraca False)"""
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def report_stats(self):
+        """Wypisuje liczbę zescrapowanych i pominiętych ofert oraz błędów dla każdego źródła"""
+        print("\nPodsumowanie źródeł:")
+        for scraper in self.scrapers:
+            stats = scraper.run_stats
+            print(f"- {scraper.source.name}: zescrapowane: {stats['scraped']}, "
+                  f"pominięte: {stats['skipped']}, błędy: {stats['errors']}")
+
+    def scrape_jobs(self, num_pages=5, max_jobs=10, known_offers=None):
+        """Scrapuje określoną liczbę stron z ofertami ze wszystkich źródeł"""
+        for job_data in self.iter_jobs(num_pages, max_jobs, known_offers):
+            self.jobs.append(job_data)
+        return self.jobs
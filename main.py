@@ -1,55 +1,214 @@
-from job_scraper import JobScraper
-from db_manager import DatabaseManager
+from job_scraper import MultiSourceScraper
+from sources import SOURCES, get_source
+from db_manager import DatabaseManager, SEARCH_FACETS
+from parquet_store import ParquetStore
+from instrumentation import metrics, Profiler
+from crawl_state import CrawlState
 import argparse
+import time
 from datetime import datetime
 
+def search(db, args):
+    """Wyszukuje oferty w bazie i wypisuje wyniki (albo plan zapytania przy --explain)"""
+    filters = {field: getattr(args, field) for field in SEARCH_FACETS if getattr(args, field)}
+    params = dict(text=args.query, filters=filters, salary_min=args.salary_min, salary_max=args.salary_max,
+                  limit=args.limit, cursor=args.cursor)
+    if args.explain:
+        plan = db.explain_search(**params)
+        print(f"Plan zapytania: {' <- '.join(plan['stages'])}")
+        print(f"Indeksy: {', '.join(plan['indexes']) or '-'}")
+        print(f"Przejrzane klucze indeksu: {plan['keys_examined']}, dokumenty: {plan['docs_examined']}, "
+              f"zwrócone: {plan['returned']}, czas: {plan['time_ms']} ms")
+        for problem in plan['problems']:
+            print(f"Uwaga: {problem}")
+        return 1 if plan['problems'] else 0
+    
+    start = time.perf_counter()
+    page = db.search(**params)
+    elapsed = (time.perf_counter() - start) * 1000
+    for job in page['results']:
+        salary = job.get('salary') or '-'
+        details = ', '.join(str(job[field]) for field in SEARCH_FACETS if job.get(field))
+        print(f"- {job.get('title')} | {salary} | {details}")
+        print(f"  {job['url']}")
+    print(f"\nZnaleziono {len(page['results'])} ofert w {elapsed:.1f} ms")
+    if page['next_cursor']:
+        print(f"Następna strona: --cursor {page['next_cursor']}")
+    return 0
+
 def main():
     # Konfiguracja parsera argumentów
     parser = argparse.ArgumentParser(description='Scraper ofert pracy z trojmiasto.pl')
     parser.add_argument('-p', '--pages', type=int, default=6,
-                      help='Liczba stron do przescrapowania (domyślnie: 6)')
+                      help='Liczba stron do przescrapowania z każdego źródła (domyślnie: 6)')
     parser.add_argument('-m', '--max-jobs', type=int, default=60,
-                      help='Maksymalna liczba ofert do pobrania (domyślnie: 60)')
+                      help='Maksymalna liczba ofert do pobrania z każdego źródła (domyślnie: 60)')
     parser.add_argument('-o', '--output', type=str,
                       default=f'jobs_{datetime.now().strftime("%Y%m%d_%H%M%S")}.csv',
                       help='Nazwa pliku wyjściowego CSV (domyślnie: jobs_YYYYMMDD_HHMMSS.csv)')
+    parser.add_argument('--format', type=str, default=None, choices=['csv', 'csv.gz', 'parquet'],
+                      help='Format eksportu (domyślnie: rozpoznawany po rozszerzeniu pliku wyjściowego)')
+    parser.add_argument('--columns', type=str, default=None,
+                      help='Lista eksportowanych pól oddzielonych przecinkami (domyślnie: wszystkie)')
+    parser.add_argument('--since', type=str, default=None,
+                      help='Eksportuj tylko oferty zescrapowane od podanej daty (YYYY-MM-DD)')
     parser.add_argument('--force-scrape', action='store_true',
                       help='Wymuś ponowne scrapowanie nawet jeśli dane istnieją w bazie')
+    parser.add_argument('-i', '--incremental', action='store_true',
+                      help='Scrapuj przyrostowo - pobieraj szczegóły tylko nowych lub zaktualizowanych ofert')
+    parser.add_argument('-c', '--concurrency', type=int, default=4,
+                      help='Liczba równoległych pobrań stron ofert (domyślnie: 4)')
+    parser.add_argument('-s', '--sources', type=str, default='trojmiasto',
+                      help=f'Źródła ofert oddzielone przecinkami, scrapowane równocześnie '
+                           f'(dostępne: {", ".join(SOURCES)}; domyślnie: trojmiasto)')
+    parser.add_argument('-r', '--rate', type=float, default=None,
+                      help='Początkowa liczba zapytań na sekundę do każdego serwisu, dostosowywana w trakcie '
+                           '(domyślnie: limit źródła)')
+    parser.add_argument('--max-retries', type=int, default=3,
+                      help='Liczba ponowień zapytania po błędzie przejściowym (domyślnie: 3)')
+    parser.add_argument('-w', '--parse-workers', type=int, default=0,
+                      help='Liczba procesów parsujących strony ofert (domyślnie: 0 - parsowanie w wątkach)')
+    parser.add_argument('--parse-batch', type=int, default=16,
+                      help='Liczba stron ofert przekazywanych do procesu parsującego w jednej paczce (domyślnie: 16)')
+    parser.add_argument('--parser', type=str, default=None, choices=['lxml', 'html.parser', 'html5lib'],
+                      help='Parser HTML (domyślnie: lxml, jeśli jest zainstalowany)')
+    parser.add_argument('--cache', type=str, nargs='?', const='http_cache.sqlite', default=None,
+                      help='Zapisuj odpowiedzi HTTP w pliku cache (domyślnie: http_cache.sqlite)')
+    parser.add_argument('--cache-ttl', type=int, default=3600,
+                      help='Czas w sekundach, przez który strona z cache nie jest rewalidowana (domyślnie: 3600)')
+    parser.add_argument('--offline', action='store_true',
+                      help='Scrapuj wyłącznie z cache, bez zapytań do sieci')
+    parser.add_argument('--resume', action='store_true',
+                      help='Wznów przerwane scrapowanie - pomiń ukończone strony i ponów oczekujące oraz nieudane oferty')
+    parser.add_argument('--crawl-state', type=str, default='crawl_state.sqlite',
+                      help='Plik stanu scrapowania używany przez --resume (domyślnie: crawl_state.sqlite)')
+    parser.add_argument('--backend', type=str, default='mongo', choices=['mongo', 'parquet'],
+                      help='Miejsce zapisu ofert: MongoDB lub lokalny magazyn Parquet bez serwera bazy (domyślnie: mongo)')
+    parser.add_argument('--store-path', type=str, default='jobs_dataset',
+                      help='Katalog magazynu Parquet dla --backend parquet (domyślnie: jobs_dataset)')
+    parser.add_argument('--summary-backend', type=str, default='stats', choices=['stats', 'aggregate', 'pandas'],
+                      help='Sposób liczenia podsumowania: zapisane liczniki, agregacja w MongoDB lub pandas (domyślnie: stats)')
+    parser.add_argument('--batch-size', type=int, default=50,
+                      help='Liczba ofert zapisywanych do bazy w jednej paczce (domyślnie: 50)')
+    parser.add_argument('--flush-interval', type=float, default=30,
+                      help='Maksymalny czas w sekundach, przez który zebrane oferty czekają na zapis do bazy (domyślnie: 30)')
+    parser.add_argument('--profile', action='store_true',
+                      help='Wypisz na końcu czasy etapów (p50/p95/p99) i liczniki uruchomienia')
+    parser.add_argument('--profile-json', type=str, default=None,
+                      help='Dopisz czasy etapów i liczniki jako linię JSON do podanego pliku')
+    parser.add_argument('--profiler', type=str, default=None, choices=['cprofile', 'pyinstrument'],
+                      help='Profiluj całe uruchomienie wybranym profilerem')
+    parser.add_argument('--profiler-output', type=str, default=None,
+                      help='Plik wynikowy profilera (domyślnie: profile.prof lub profile.html)')
+    
+    # Dodatkowe polecenia - bez polecenia uruchamiamy scraping, eksport i podsumowanie
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('rebuild-stats', help='Przelicz od zera statystyki ofert w kolekcji job_stats')
+    subparsers.add_parser('reextract', help='Ponownie wyciągnij wynagrodzenie, godziny i harmonogram z zapisanych opisów')
+    subparsers.add_parser('dedup', help='Wyszukaj od nowa duplikaty ofert (te same oferty pod różnymi URL)')
+    subparsers.add_parser('compact', help='Scal małe pliki magazynu Parquet (tylko --backend parquet)')
+    search_parser = subparsers.add_parser('search', help='Wyszukaj zapisane oferty po słowach kluczowych i filtrach')
+    search_parser.add_argument('query', nargs='?', default=None, help='Słowa kluczowe w tytule lub opisie oferty')
+    for field in SEARCH_FACETS:
+        search_parser.add_argument(f"--{field.replace('_', '-')}", action='append', default=None,
+                                   help=f'Tylko oferty o podanej wartości pola {field} (można podać kilka razy)')
+    search_parser.add_argument('--salary-min', type=int, default=None,
+                               help='Minimalna dolna granica wynagrodzenia (PLN)')
+    search_parser.add_argument('--salary-max', type=int, default=None,
+                               help='Maksymalna dolna granica wynagrodzenia (PLN)')
+    search_parser.add_argument('--limit', type=int, default=20, help='Liczba ofert na stronie wyników (domyślnie: 20)')
+    search_parser.add_argument('--cursor', type=str, default=None, help='Kursor następnej strony z poprzedniego wyniku')
+    search_parser.add_argument('--explain', action='store_true',
+                               help='Wypisz plan zapytania (indeksy, przejrzane dokumenty) zamiast wyników')
     
     args = parser.parse_args()
     
+    profiler = Profiler(args.profiler, args.profiler_output) if args.profiler else None
+    if profiler:
+        profiler.start()
+    
     try:
-        # Inicjalizacja połączenia z bazą danych
-        db = DatabaseManager()
+        # Inicjalizacja połączenia z bazą danych lub magazynu Parquet
+        if args.backend == 'parquet':
+            db = ParquetStore(args.store_path)
+            if args.command == 'compact':
+                db.compact()
+                return 0
+            if args.command:
+                print(f"Polecenie {args.command} wymaga bazy MongoDB (--backend mongo)")
+                return 1
+        else:
+            db = DatabaseManager()
+            if args.command == 'compact':
+                print("Polecenie compact dotyczy tylko magazynu Parquet (--backend parquet)")
+                return 1
+        
+        if args.command == 'rebuild-stats':
+            mismatches = db.rebuild_stats()
+            return 1 if mismatches else 0
+        if args.command == 'reextract':
+            db.reextract_fields()
+            return 0
+        if args.command == 'dedup':
+            db.find_duplicates()
+            return 0
+        if args.command == 'search':
+            return search(db, args)
         
         # Sprawdzamy czy mamy już dane w bazie
         existing_jobs = db.get_jobs_count()
         
-        if existing_jobs == 0 or args.force_scrape:
+        if existing_jobs == 0 or args.force_scrape or args.incremental or args.resume:
             # Jeśli baza jest pusta lub wymuszono scraping, pobieramy nowe dane
             print("Uruchamiam scraper ofert pracy...")
             print(f"Pobieram maksymalnie {args.max_jobs} ofert z {args.pages} stron")
             
-            scraper = JobScraper()
-            scraper.scrape_jobs(num_pages=args.pages, max_jobs=args.max_jobs)
+            # W trybie przyrostowym pomijamy oferty zapisane już w bazie
+            known_offers = db.get_known_offers() if args.incremental else None
+            
+            # Stan scrapowania zapisujemy zawsze - każde przerwane scrapowanie można wznowić
+            crawl_state = CrawlState(args.crawl_state, resume=args.resume)
+            if args.resume:
+                state = crawl_state.summary()
+                print(f"Wznawiam scrapowanie: ukończone strony: {state['pages_done']} "
+                      f"(ostatnia: {state['last_page'] or '-'}), oczekujące oferty: {state['pending']}, "
+                      f"nieudane oferty: {state['failed']}, nieudane strony: {state['pages_failed']}")
             
-            # Zapisujemy wyniki do bazy
-            saved_count = db.save_jobs(scraper.jobs)
-            print(f"\nZapisano {saved_count} ofert w bazie danych")
+            # Tryb offline bez podanego pliku cache korzysta z domyślnego pliku
+            cache_path = args.cache or ('http_cache.sqlite' if args.offline else None)
+            sources = [get_source(name.strip()) for name in args.sources.split(',') if name.strip()]
+            scraper = MultiSourceScraper(sources, concurrency=args.concurrency, parser=args.parser,
+                                         cache_path=cache_path, cache_ttl=args.cache_ttl, offline=args.offline,
+                                         rate=args.rate, max_retries=args.max_retries,
+                                         parse_workers=args.parse_workers, parse_batch=args.parse_batch,
+                                         crawl_state=crawl_state)
+            jobs = scraper.iter_jobs(num_pages=args.pages, max_jobs=args.max_jobs, known_offers=known_offers)
+            
+            # Zapisujemy oferty do bazy na bieżąco, paczkami
+            # Oferty oznaczamy w stanie scrapowania jako zakończone dopiero po zapisie do bazy
+            try:
+                saved_counts = db.save_jobs(jobs, batch_size=args.batch_size, flush_interval=args.flush_interval,
+                                            on_saved=crawl_state.mark_saved)
+            finally:
+                crawl_state.close()
+            print(f"\nZapisano {sum(saved_counts.values())} ofert w bazie danych "
+                  f"(nowe: {saved_counts['inserted']}, zaktualizowane: {saved_counts['updated']})")
         else:
             print(f"Znaleziono {existing_jobs} ofert w bazie danych")
             print("Użyj --force-scrape aby wymusić ponowne pobranie danych")
         
         # Eksportujemy dane z bazy do CSV
-        exported_count = db.export_to_csv(args.output)
+        columns = args.columns.split(',') if args.columns else None
+        exported_count = db.export_to_csv(args.output, columns=columns, since=args.since, file_format=args.format)
         print(f"Wyeksportowano {exported_count} ofert do {args.output}")
         
         # Wyświetlenie podsumowania
         print("\nPodsumowanie scrapowania:")
         print("-" * 50)
-        summary = db.get_jobs_summary()
+        summary = db.get_jobs_summary(backend=args.summary_backend)
         
         print(f"Całkowita liczba ofert w bazie: {summary['total_jobs']}")
+        print(f"Unikalne oferty (bez duplikatów): {summary['unique_jobs']}")
         
         print("\nRodzaje umów:")
         for contract_type, count in summary['contract_types'].items():
@@ -80,8 +239,8 @@ def main():
             
         if 'work_time_analysis' in summary:
             print("\nRozkład czasu pracy:")
-            for time, count in summary['work_time_analysis'].items():
-                print(f"- {time}: {count}")
+            for work_time, count in summary['work_time_analysis'].items():
+                print(f"- {work_time}: {count}")
                 
         if 'industry_trends' in summary:
             print("\nTrendy w branżach:")
@@ -103,6 +262,15 @@ def main():
         print(f"Wystąpił błąd: {e}")
         return 1
         
+    finally:
+        # Profil uruchomienia wypisujemy także wtedy, gdy scraping zakończył się błędem
+        if profiler:
+            profiler.stop()
+        if args.profile:
+            metrics.report()
+        if args.profile_json:
+            metrics.dump_json(args.profile_json)
+        
     return 0
 
 if __name__ == "__main__":
@@ -0,0 +1,342 @@
+import gzip
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from db_manager import DatabaseManager, EXPORT_COLUMNS, content_hash, description_hash, iter_batches
+from dedup import LSHIndex, lsh_bands, minhash_signatures, signature_from_bytes, signature_to_bytes
+from instrumentation import metrics
+
+# Magazyn kolumnowy wymaga pyarrow
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pc = pq = None
+
+# Pola o niewielkiej liczbie różnych wartości - zapisujemy je słownikowo (kategorie)
+CATEGORICAL_FIELDS = ['contract_type', 'work_mode', 'industry', 'position_level', 'work_time', 'location', 'source']
+STRING_FIELDS = ['title', 'url', 'offer_id', 'salary', 'date_posted', 'date_updated', 'description',
+                 'work_schedule', 'scraped_date', 'content_hash', 'description_hash', 'duplicate_of']
+PARTITION_FIELD = 'scrape_date'
+
+
+def _schema():
+    """Stały schemat plików magazynu - zakres wynagrodzenia rozbijamy na kolumny liczbowe"""
+    fields = [pa.field(name, pa.string()) for name in STRING_FIELDS]
+    fields += [pa.field(name, pa.dictionary(pa.int32(), pa.string())) for name in CATEGORICAL_FIELDS]
+    fields += [
+        pa.field('salary_min', pa.int64()),
+        pa.field('salary_max', pa.int64()),
+        pa.field('salary_currency', pa.dictionary(pa.int32(), pa.string())),
+        pa.field('monthly_hours', pa.int32()),
+        pa.field('benefits', pa.list_(pa.string())),
+        pa.field('minhash', pa.binary()),
+        pa.field('saved_to_db', pa.timestamp('ms')),
+    ]
+    return pa.schema(fields)
+
+
+class ParquetStore:
+    """Lokalny magazyn ofert w plikach Parquet (bez serwera bazy) z tym samym interfejsem co DatabaseManager
+
+    Zbiór jest tylko dopisywany: każda zapisana wersja oferty trafia do partycji
+    scrape_date=YYYY-MM-DD, a odczyty biorą najnowszą wersję każdego URL. Podsumowania
+    czytają z plików (mapowanych w pamięci) tylko potrzebne kolumny.
+    """
+
+    def __init__(self, path='jobs_dataset', batch_size=500):
+        if pa is None:
+            raise RuntimeError("Magazyn Parquet wymaga pakietu pyarrow")
+        print(f"Otwieram magazyn ofert Parquet {path}...")
+        self.path = path
+        self.batch_size = batch_size
+        self.schema = _schema()
+        os.makedirs(path, exist_ok=True)
+        # Hashe treści i indeks duplikatów wczytujemy dopiero przy pierwszym zapisie
+        self.hashes = None
+        self.duplicate_index = None
+
+    def _files(self):
+        """Zwraca pliki zbioru (według partycji, a w partycji - w kolejności zapisu)"""
+        files = []
+        for partition in sorted(os.listdir(self.path)):
+            directory = os.path.join(self.path, partition)
+            if partition.startswith(f'{PARTITION_FIELD}=') and os.path.isdir(directory):
+                files += [os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                          if name.endswith('.parquet')]
+        return files
+
+    def _read(self, columns, since=None):
+        """Czyta wybrane kolumny najnowszych wersji ofert jako tabelę Arrow (pliki mapowane w pamięci)"""
+        files = self._files()
+        if since:
+            # Partycje starsze niż since pomijamy bez otwierania plików
+            files = [f for f in files if os.path.basename(os.path.dirname(f)).split('=', 1)[1] >= since[:10]]
+        if not files:
+            return self.schema.empty_table().select(columns)
+        # Kolumny potrzebne do wyboru najnowszych wersji i filtra since czytamy zawsze, a na końcu odrzucamy
+        read_columns = list(dict.fromkeys(columns + ['url', 'saved_to_db'] + (['scraped_date'] if since else [])))
+        table = pa.concat_tables(
+            [pq.read_table(f, columns=read_columns, memory_map=True, schema=self.schema) for f in files]
+        ).unify_dictionaries()
+        # Najnowsza wersja każdej oferty według daty zapisu - oferta zapisana ponownie może trafić
+        # do partycji wcześniejszego dnia scrapowania niż jej poprzednia wersja
+        versions = pd.DataFrame({'url': table.column('url').to_pandas(),
+                                 'saved_to_db': table.column('saved_to_db').to_pandas()})
+        if versions['url'].duplicated().any():
+            latest = versions.sort_values('saved_to_db', kind='stable').drop_duplicates('url', keep='last').index
+            table = table.take(pa.array(np.sort(latest.to_numpy())))
+        if since:
+            table = table.filter(pc.greater_equal(table.column('scraped_date'), since))
+        return table.select(columns)
+
+    def save_jobs(self, jobs_data, batch_size=None, flush_interval=None, on_saved=None):
+        """Dopisuje oferty do magazynu paczkami - oferty z niezmienionym content_hash pomijamy"""
+        counts = {'inserted': 0, 'updated': 0, 'unchanged': 0}
+        if not jobs_data:
+            return counts
+
+        batch_size = batch_size or self.batch_size
+        try:
+            for batch in iter_batches(jobs_data, batch_size, flush_interval):
+                saved_to_db = datetime.now()
+                for job in batch.values():
+                    job['saved_to_db'] = saved_to_db
+                self._flush_batch(batch, counts, on_saved)
+        finally:
+            print(f"Zapisano {sum(counts.values())} ofert w magazynie "
+                  f"(nowe: {counts['inserted']}, zaktualizowane: {counts['updated']}, bez zmian: {counts['unchanged']})")
+        return counts
+
+    def _flush_batch(self, batch, counts, on_saved=None):
+        """Zapisuje paczkę ofert i przekazuje adresy zapisanych ofert do on_saved"""
+        with metrics.timer('save_jobs'):
+            saved_urls = self._write_batch(list(batch.values()), counts)
+        if on_saved:
+            on_saved(saved_urls)
+
+    def _write_batch(self, jobs, counts):
+        """Dopisuje zmienione oferty z paczki jako nowy plik w partycji dnia scrapowania"""
+        if self.hashes is None:
+            table = self._read(['url', 'content_hash'])
+            self.hashes = dict(zip(table.column('url').to_pylist(), table.column('content_hash').to_pylist()))
+
+        changed = []
+        for job in jobs:
+            if 'description' in job:
+                job['description_hash'] = description_hash(job['description'])
+            job['content_hash'] = content_hash(job)
+            old_hash = self.hashes.get(job['url'])
+            if old_hash == job['content_hash']:
+                counts['unchanged'] += 1
+                continue
+            counts['updated' if job['url'] in self.hashes else 'inserted'] += 1
+            changed.append(job)
+        metrics.increment('db.jobs_unchanged', len(jobs) - len(changed))
+        metrics.increment('db.jobs_written', len(changed))
+
+        if changed:
+            with metrics.timer('save_jobs.dedup'):
+                self._mark_duplicates(changed)
+            by_date = {}
+            for job in changed:
+                by_date.setdefault(self._scrape_date(job), []).append(job)
+            with metrics.timer('save_jobs.write_parquet'):
+                for scrape_date, date_jobs in by_date.items():
+                    directory = os.path.join(self.path, f'{PARTITION_FIELD}={scrape_date}')
+                    os.makedirs(directory, exist_ok=True)
+                    filename = f"part-{datetime.now().strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}.parquet"
+                    pq.write_table(self._to_table(date_jobs), os.path.join(directory, filename))
+            for job in changed:
+                self.hashes[job['url']] = job['content_hash']
+        return [job['url'] for job in jobs]
+
+    def _mark_duplicates(self, jobs):
+        """Oznacza duplikaty ofert (duplicate_of) indeksem LSH trzymanym w pamięci"""
+        if self.duplicate_index is None:
+            self.duplicate_index = LSHIndex()
+            table = self._read(['url', 'minhash', 'duplicate_of'])
+            for url, minhash, duplicate_of in zip(*(table.column(c).to_pylist() for c in table.column_names)):
+                if minhash is not None:
+                    self.duplicate_index.add(url, signature_from_bytes(minhash), duplicate_of)
+        jobs = [job for job in jobs if job.get('description')]
+        for job, signature in zip(jobs, minhash_signatures([job['description'] for job in jobs])):
+            if signature is None:
+                continue
+            job_bands = lsh_bands(signature)
+            cluster = self.duplicate_index.query(signature, job_bands)
+            job['duplicate_of'] = cluster if cluster != job['url'] else None
+            job['minhash'] = signature_to_bytes(signature)
+            self.duplicate_index.add(job['url'], signature, job['duplicate_of'], job_bands)
+
+    @staticmethod
+    def _scrape_date(job):
+        """Zwraca dzień scrapowania oferty (YYYY-MM-DD) - klucz partycji"""
+        scraped_date = job.get('scraped_date')
+        if isinstance(scraped_date, str) and len(scraped_date) >= 10:
+            return scraped_date[:10]
+        return job['saved_to_db'].strftime('%Y-%m-%d')
+
+    def _to_table(self, jobs):
+        """Zamienia oferty na tabelę Arrow o schemacie magazynu"""
+        columns = {name: [] for name in self.schema.names}
+        for job in jobs:
+            salary_range = job.get('salary_range') or {}
+            values = {
+                **job,
+                'salary_min': salary_range.get('min'),
+                'salary_max': salary_range.get('max'),
+                'salary_currency': salary_range.get('currency'),
+            }
+            for name in STRING_FIELDS + CATEGORICAL_FIELDS:
+                value = values.get(name)
+                columns[name].append(None if value is None else str(value))
+            for name in ('salary_min', 'salary_max', 'salary_currency', 'monthly_hours', 'minhash', 'saved_to_db'):
+                columns[name].append(values.get(name))
+            columns['benefits'].append(job.get('benefits'))
+        return pa.Table.from_pydict(columns, schema=self.schema)
+
+    def get_known_offers(self):
+        """Zwraca daty dodania i aktualizacji zapisanych ofert według URL i ID oferty"""
+        table = self._read(['url', 'offer_id', 'date_posted', 'date_updated'])
+        known_offers = {}
+        for url, offer_id, date_posted, date_updated in zip(*(table.column(c).to_pylist() for c in table.column_names)):
+            dates = {date_updated, date_posted} - {None}
+            known_offers[url] = dates
+            if offer_id:
+                known_offers[offer_id] = dates
+        return known_offers
+
+    def get_jobs_count(self):
+        """Zwraca liczbę ofert w magazynie (najnowszych wersji)"""
+        return self._read(['url']).num_rows
+
+    def export_to_csv(self, filename, columns=None, query=None, since=None, file_format=None, batch_size=1000):
+        """Eksportuje najnowsze wersje ofert do pliku CSV, CSV skompresowanego gzip lub Parquet"""
+        if query:
+            raise ValueError("Magazyn Parquet nie obsługuje zapytań MongoDB - użyj parametru since")
+        columns = list(columns or EXPORT_COLUMNS)
+        file_format = file_format or DatabaseManager._export_format(filename)
+        read_columns = [c for c in columns if c in self.schema.names]
+        if 'salary_range' in columns:
+            read_columns += ['salary_min', 'salary_max', 'salary_currency']
+        table = self._read(list(dict.fromkeys(read_columns)), since=since)
+
+        exported = 0
+        writer = None
+        try:
+            for batch in table.to_batches(max_chunksize=batch_size):
+                df = batch.to_pandas()
+                if 'salary_range' in columns:
+                    df['salary_range'] = [
+                        {'min': int(low), 'max': int(high), 'currency': currency} if low == low and high == high else None
+                        for low, high, currency in zip(df['salary_min'], df['salary_max'], df['salary_currency'])
+                    ]
+                df = df.reindex(columns=columns)
+                if file_format == 'parquet':
+                    arrow_batch = DatabaseManager._to_arrow(df)
+                    if writer is None:
+                        writer = pq.ParquetWriter(filename, arrow_batch.schema)
+                    writer.write_table(arrow_batch)
+                else:
+                    if writer is None:
+                        opener = gzip.open if file_format == 'csv.gz' else open
+                        writer = opener(filename, 'wt', encoding='utf-8', newline='')
+                    df.to_csv(writer, index=False, header=exported == 0)
+                exported += len(df)
+        finally:
+            if writer is not None:
+                writer.close()
+
+        if exported:
+            print(f"Wyeksportowano {exported} ofert do pliku {filename}")
+        return exported
+
+    def get_jobs_summary(self, backend=None):
+        """Liczy podsumowanie ofert z kolumn magazynu (backend - dla zgodności z DatabaseManager, ignorowany)"""
+        with metrics.timer('get_jobs_summary.parquet'):
+            return self._get_jobs_summary()
+
+    def _get_jobs_summary(self):
+        """Liczy podsumowanie na kolumnach kategorii (pandas Categorical) - bez opisów i pozostałych pól"""
+        columns = CATEGORICAL_FIELDS + ['salary', 'salary_min', 'salary_max', 'date_posted', 'duplicate_of', 'benefits']
+        df = self._read(columns).to_pandas()
+
+        def counts(column, limit=None):
+            # Kategorie bez ofert (np. z nadpisanych wersji) pomijamy
+            values = df[column].value_counts()
+            values = values[values > 0]
+            return {str(key): int(value) for key, value in values.head(limit).items()}
+
+        summary = {
+            'total_jobs': len(df),
+            'unique_jobs': int(df['duplicate_of'].isna().sum()),
+            'contract_types': counts('contract_type'),
+            'jobs_by_location': counts('location', 10),
+            'work_modes': counts('work_mode'),
+            'industries': counts('industry'),
+            'position_levels': counts('position_level'),
+            'benefits_distribution': {str(k): int(v) for k, v in df['benefits'].explode().dropna().value_counts().items()},
+            'salary_stats': counts('salary'),
+        }
+
+        salaries = df[['salary_min', 'salary_max']].dropna()
+        if not salaries.empty:
+            summary['advanced_salary_stats'] = {
+                'mean_min_salary': int(salaries['salary_min'].mean()),
+                'mean_max_salary': int(salaries['salary_max'].mean()),
+                'median_min_salary': int(salaries['salary_min'].median()),
+                'median_max_salary': int(salaries['salary_max'].median()),
+                'std_min_salary': int(salaries['salary_min'].std()) if len(salaries) > 1 else 0,
+                'std_max_salary': int(salaries['salary_max'].std()) if len(salaries) > 1 else 0,
+            }
+
+        work_times = counts('work_time')
+        if work_times:
+            summary['work_time_analysis'] = work_times
+
+        days = pd.to_datetime(df['date_posted'], format='%d.%m.%Y', errors='coerce')
+        by_day = pd.DataFrame({'industry': df['industry'], 'day': days}).dropna()
+        if not by_day.empty:
+            day_totals = by_day['day'].value_counts()
+            last_day = by_day['day'].max()
+            last_day_counts = by_day.loc[by_day['day'] == last_day, 'industry'].value_counts()
+            summary['industry_trends'] = {
+                'most_active_day': day_totals.idxmax().strftime('%Y-%m-%d'),
+                'top_growing_industries': [str(k) for k in last_day_counts[last_day_counts > 0].head(5).index],
+            }
+
+        locations = df['location'].value_counts()
+        locations = locations[locations > 0]
+        if not locations.empty:
+            summary['location_analysis'] = DatabaseManager._location_analysis(locations)
+
+        return summary
+
+    def compact(self):
+        """Scala pliki każdej partycji w jeden plik (zachowując wszystkie wersje ofert)"""
+        merged = 0
+        for partition in sorted(os.listdir(self.path)):
+            directory = os.path.join(self.path, partition)
+            if not os.path.isdir(directory):
+                continue
+            files = sorted(os.path.join(directory, name) for name in os.listdir(directory) if name.endswith('.parquet'))
+            if len(files) < 2:
+                continue
+            table = pa.concat_tables([pq.read_table(f, schema=self.schema) for f in files]).unify_dictionaries()
+            # Nazwa scalonego pliku sortuje się jak pierwszy scalany plik - kolejność wersji się nie zmienia
+            target = files[0][:-len('.parquet')] + '-compacted.parquet'
+            pq.write_table(table, target + '.tmp')
+            # Najpierw udostępniamy scalony plik, a dopiero potem usuwamy źródłowe - przerwanie w trakcie
+            # zostawia najwyżej powtórzone wersje ofert, które odczyt i tak sprowadza do najnowszej
+            os.replace(target + '.tmp', target)
+            for f in files:
+                os.remove(f)
+            merged += len(files)
+        print(f"Scalono {merged} plików magazynu")
+        return merged
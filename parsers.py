@@ -0,0 +1,131 @@
+from time import perf_counter
+
+from bs4 import BeautifulSoup, SoupStrainer
+from extraction import extract_fields, map_detail_field
+
+# Domyślnie korzystamy z lxml (najszybszy parser), a jeśli nie jest zainstalowany - z html.parser
+try:
+    import lxml  # noqa: F401
+    DEFAULT_PARSER = 'lxml'
+except ImportError:
+    DEFAULT_PARSER = 'html.parser'
+
+
+def has_class(*class_names):
+    """Zwraca filtr atrybutu class pasujący do elementów z dowolną z podanych klas"""
+    class_names = set(class_names)
+
+    def matches(value):
+        # Podczas parsowania atrybut class bywa jeszcze niepodzielonym napisem "a b c"
+        return value is not None and not class_names.isdisjoint(value.split())
+
+    return matches
+
+
+# Strona z listą ofert - potrzebujemy tylko elementów list__item
+LISTING_STRAINER = SoupStrainer('div', class_=has_class('list__item'))
+
+# Strona oferty - potrzebujemy tylko opisu, panelu szczegółów, adresu i statystyk
+DETAIL_STRAINER = SoupStrainer(class_=has_class(
+    'ogl__description', 'oglDetails', 'topBar__item--address', 'oglStats'
+))
+
+
+def make_soup(content, parse_only=None, parser=None):
+    """Buduje drzewo BeautifulSoup z bajtów odpowiedzi, ograniczone do wybranych fragmentów strony"""
+    return BeautifulSoup(content, parser or DEFAULT_PARSER, parse_only=parse_only)
+
+
+def parse_listing_page(content, parser=None):
+    """Parsuje stronę z listą ofert (tylko elementy list__item)"""
+    return make_soup(content, LISTING_STRAINER, parser)
+
+
+def parse_detail_page(content, parser=None):
+    """Parsuje stronę oferty (tylko fragmenty, z których wyciągamy szczegóły)"""
+    return make_soup(content, DETAIL_STRAINER, parser)
+
+
+def parse_job_details(content, parser=None):
+    """Wyciąga szczegóły oferty ze strony oferty (funkcja modułu - można ją uruchamiać w procesach roboczych)"""
+    soup = parse_detail_page(content, parser)
+    
+    job_details = {}
+    
+    # Znajdujemy główną treść opisu oferty
+    description_div = soup.find('div', class_='ogl__description')
+    if description_div:
+        description_text = description_div.get_text(strip=True)
+        job_details['description'] = description_text
+        
+        # Wyciągamy zakres wynagrodzenia, godziny i harmonogram pracy z opisu
+        job_details.update(extract_fields(description_text))
+    
+    # Wyciągamy dodatkowe szczegóły z panelu oglDetails
+    details_panel = soup.find('div', class_='oglDetails')
+    if details_panel:
+        # Znajdujemy wszystkie kontenery pól
+        fields = details_panel.find_all('div', class_='oglField')
+        for field in fields:
+            # Pobieramy nazwę i wartość pola
+            name_div = field.find('div', class_='oglField__name')
+            value_divs = field.find_all('div', class_='oglField__value')
+            
+            if name_div:
+                field_name = name_div.get_text(strip=True).lower()
+                field_values = [v.get_text(strip=True) for v in value_divs]
+                field_value = ', '.join(field_values) if field_values else None
+                
+                # Mapujemy nazwy pól do naszej struktury
+                key = map_detail_field(field_name)
+                if key:
+                    job_details[key] = field_value
+    
+    # Pobieramy informacje o lokalizacji z pełnym adresem
+    location_div = soup.find('span', class_='topBar__item--address')
+    if location_div:
+        location_text = location_div.get_text(strip=True)
+        # Dzielimy na miasto i ulicę
+        location_parts = location_text.split('\n')
+        if len(location_parts) > 1:
+            job_details['city'] = location_parts[0].strip()
+            job_details['street'] = location_parts[1].strip()
+        job_details['location'] = location_text
+    
+    # Pobieramy datę dodania, aktualizacji i ID oferty
+    stats_div = soup.find('div', class_='oglStats')
+    if stats_div:
+        date_elements = stats_div.find_all('p')
+        for date_el in date_elements:
+            date_text = date_el.get_text(strip=True)
+            if 'Data dodania' in date_text:
+                job_details['date_posted'] = date_el.find('span').get_text(strip=True)
+            elif 'Aktualizacja' in date_text:
+                job_details['date_updated'] = date_el.find('span').get_text(strip=True)
+            elif 'ID oferty' in date_text:
+                job_details['offer_id'] = date_el.find('span').get_text(strip=True)
+    
+    return job_details
+
+
+def parse_job_details_batch(contents, parser=None, parse_details=None):
+    """Parsuje paczkę stron ofert - jedno przekazanie danych między procesami na całą paczkę
+
+    parse_details to parser strony oferty ze źródła ofert (domyślnie parse_job_details).
+    Zwraca szczegóły ofert i czasy parsowania poszczególnych stron (w sekundach).
+    """
+    parse_details = parse_details or parse_job_details
+    results = []
+    durations = []
+    for content in contents:
+        if content is None:
+            results.append({})
+            continue
+        start = perf_counter()
+        try:
+            results.append(parse_details(content, parser))
+        except Exception as e:
+            print(f"Błąd podczas parsowania opisu oferty: {e}")
+            results.append({})
+        durations.append(perf_counter() - start)
+    return results, durations
@@ -0,0 +1,148 @@
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+# Kody odpowiedzi oznaczające błąd przejściowy - takie zapytania ponawiamy
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def parse_retry_after(value):
+    """Zamienia nagłówek Retry-After (sekundy lub data HTTP) na liczbę sekund oczekiwania"""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Kubełek żetonów - ogranicza liczbę zapytań na sekundę, bezpieczny dla wielu wątków"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        # Po odpowiedzi z Retry-After wstrzymujemy wszystkie zapytania do tego momentu
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def acquire(self):
+        """Czeka na wolny żeton i go zabiera"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self.paused_until - now
+                if wait <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(wait, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def set_rate(self, rate):
+        """Zmienia tempo napełniania kubełka"""
+        with self.lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def pause(self, seconds):
+        """Wstrzymuje wydawanie żetonów na podaną liczbę sekund"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class AdaptiveRateLimiter:
+    """Limit zapytań na host, który zwalnia po błędach i przyspiesza, gdy serwer odpowiada szybko (AIMD)"""
+
+    def __init__(self, rate=4.0, min_rate=0.2, max_rate=20.0, increase=0.2, decrease=0.5, slow_response=2.0):
+        # rate - początkowa liczba zapytań na sekundę dla każdego hosta
+        # increase - o ile zwiększamy tempo po szybkiej odpowiedzi
+        # decrease - ile razy zwalniamy po błędzie (lub wolnej odpowiedzi - łagodniej)
+        # slow_response - czas odpowiedzi w sekundach, powyżej którego uznajemy serwer za przeciążony
+        # Granice tempa obejmują zawsze tempo początkowe - inaczej pierwsza odpowiedź przycięłaby je do max_rate
+        self.initial_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.max_rate = max(max_rate, rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_response = slow_response
+        self.buckets = {}
+        self.host_stats = {}
+        self.lock = threading.Lock()
+
+    def _host(self, url):
+        host = urlsplit(url).netloc
+        with self.lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.initial_rate)
+                self.host_stats[host] = {'requests': 0, 'errors': 0, 'retry_after': 0}
+        return host
+
+    def acquire(self, url):
+        """Czeka, aż zapytanie do hosta z URL zmieści się w limicie"""
+        host = self._host(url)
+        self.buckets[host].acquire()
+        with self.lock:
+            self.host_stats[host]['requests'] += 1
+
+    def record_success(self, url, elapsed):
+        """Dostosowuje tempo po udanej odpowiedzi trwającej elapsed sekund"""
+        host = self._host(url)
+        bucket = self.buckets[host]
+        if elapsed < self.slow_response:
+            bucket.set_rate(min(self.max_rate, bucket.rate + self.increase))
+        else:
+            bucket.set_rate(max(self.min_rate, bucket.rate * (1 + self.decrease) / 2))
+
+    def record_error(self, url, retry_after=None):
+        """Zwalnia tempo po błędzie, a przy Retry-After wstrzymuje zapytania do hosta"""
+        host = self._host(url)
+        bucket = self.buckets[host]
+        bucket.set_rate(max(self.min_rate, bucket.rate * self.decrease))
+        with self.lock:
+            self.host_stats[host]['errors'] += 1
+            if retry_after:
+                self.host_stats[host]['retry_after'] += 1
+        if retry_after:
+            bucket.pause(retry_after)
+
+    def report(self):
+        """Zwraca aktualne tempo i liczniki zapytań dla każdego hosta"""
+        with self.lock:
+            return {
+                host: {'rate': round(self.buckets[host].rate, 2), **stats}
+                for host, stats in self.host_stats.items()
+            }
+
+
+class RetryPolicy:
+    """Ponawianie zapytań z wykładniczym opóźnieniem i losowym rozrzutem (full jitter)"""
+
+    def __init__(self, max_retries=3, backoff_base=0.5, backoff_max=30.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    def delay(self, attempt, retry_after=None):
+        """Zwraca czas oczekiwania przed ponowieniem zapytania numer attempt (od 0)"""
+        backoff = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        # Serwer sam podał, kiedy możemy wrócić - nie pytamy wcześniej
+        if retry_after is not None:
+            return max(backoff, min(retry_after, self.backoff_max))
+        return backoff
@@ -0,0 +1,116 @@
+import re
+from urllib.parse import urljoin
+
+from parsers import parse_listing_page, parse_job_details
+
+# ID oferty jest częścią adresu oferty (np. ...-ogl65412345.html)
+OFFER_ID_PATTERN = re.compile(r'ogl(\d+)\.html')
+
+
+class JobSource:
+    """Źródło ofert pracy - adresy stron z listą ofert, parser listy ofert i parser strony oferty
+
+    Obiekt źródła musi dać się przesłać do procesu roboczego (pickle), bo parse_job_details
+    uruchamiamy także w procesach parsujących.
+    """
+
+    name = None
+    default_url = None
+    # Początkowa liczba zapytań na sekundę do serwisu
+    rate = 4.0
+
+    def __init__(self, base_url=None, name=None, rate=None):
+        # base_url, name i rate można podmienić, np. na lokalny serwer w benchmarkach
+        self.base_url = base_url or self.default_url
+        self.name = name or self.name
+        self.rate = rate or self.rate
+
+    def listing_url(self, page):
+        """Zwraca adres strony z listą ofert numer page (od 1)"""
+        raise NotImplementedError
+
+    def parse_listing_page(self, content, parser=None):
+        """Zwraca elementy ofert ze strony z listą ofert"""
+        raise NotImplementedError
+
+    def parse_listing_item(self, item):
+        """Zwraca podstawowe informacje o ofercie z elementu listy (title, url, offer_id,
+        location, salary, date_posted) lub None"""
+        raise NotImplementedError
+
+    def parse_job_details(self, content, parser=None):
+        """Zwraca szczegóły oferty ze strony oferty"""
+        raise NotImplementedError
+
+
+class TrojmiastoSource(JobSource):
+    """Oferty pracy z ogloszenia.trojmiasto.pl"""
+
+    name = 'trojmiasto'
+    default_url = 'https://ogloszenia.trojmiasto.pl/praca-zatrudnie/'
+
+    def listing_url(self, page):
+        """Zwraca adres strony z listą ofert numer page (od 1)"""
+        return f"{self.base_url}?strona={page}" if page > 1 else self.base_url
+
+    def parse_listing_page(self, content, parser=None):
+        """Zwraca elementy list__item ze strony z listą ofert"""
+        return parse_listing_page(content, parser).find_all('div', class_='list__item')
+
+    def parse_listing_item(self, item):
+        """Parsuje podstawowe informacje o ofercie widoczne na liście ofert"""
+        # Znajdujemy tytuł i URL oferty
+        title_element = item.find('h2')
+        if not title_element:
+            return None
+
+        title = title_element.get_text(strip=True)
+        url = title_element.find('a')['href'] if title_element.find('a') else None
+        if not url:
+            return None
+        # Adresy względne rozwijamy względem adresu listy ofert
+        url = urljoin(self.base_url, url)
+
+        # Pobieramy podstawowe informacje o ofercie
+        location = None
+        location_div = item.find('div', class_='list__location')
+        if location_div:
+            location = location_div.get_text(strip=True)
+
+        # Pobieramy wynagrodzenie jeśli dostępne
+        salary = None
+        salary_div = item.find('div', class_='list__salary')
+        if salary_div:
+            salary = salary_div.get_text(strip=True)
+
+        # Pobieramy datę dodania oferty
+        date_posted = None
+        date_div = item.find('div', class_='list__date')
+        if date_div:
+            date_posted = date_div.get_text(strip=True)
+
+        offer_id_match = OFFER_ID_PATTERN.search(url)
+
+        return {
+            'title': title,
+            'url': url,
+            'offer_id': offer_id_match.group(1) if offer_id_match else None,
+            'location': location,
+            'salary': salary,
+            'date_posted': date_posted,
+        }
+
+    def parse_job_details(self, content, parser=None):
+        """Wyciąga szczegóły oferty ze strony oferty (ogl__description, oglDetails, oglStats)"""
+        return parse_job_details(content, parser)
+
+
+# Dostępne źródła ofert według nazwy
+SOURCES = {source.name: source for source in [TrojmiastoSource]}
+
+
+def get_source(name, base_url=None):
+    """Tworzy źródło ofert o podanej nazwie"""
+    if name not in SOURCES:
+        raise ValueError(f"Nieznane źródło ofert: {name} (dostępne: {', '.join(SOURCES)})")
+    return SOURCES[name](base_url)